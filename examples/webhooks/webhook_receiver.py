@@ -0,0 +1,76 @@
+"""
+Ejemplo: Receptor de webhooks para producción (asyncio, sin Flask)
+
+A diferencia de webhook_server.py, este receptor verifica la firma, encola
+el evento y responde 200 de inmediato; los handlers corren después en un
+pool acotado de workers, así un handler lento no provoca reintentos de
+Skydropx. Los eventos ya recibidos (mismo id) se confirman sin volver a
+procesarse, aun después de reiniciar, y cada evento se guarda en un spool
+en disco antes del 200 para poder reprocesarlo.
+
+Uso:
+    python webhook_receiver.py
+    python webhook_receiver.py replay [offset]   # reprocesa desde el checkpoint (u offset)
+
+    curl http://localhost:3000/health
+"""
+
+import os
+import sys
+from pathlib import Path
+
+from dotenv import load_dotenv
+
+# Agregar el directorio src al path
+sys.path.insert(0, str(Path(__file__).parent.parent.parent / 'src' / 'clients' / 'python'))
+
+from webhooks import WebhookVerifier, SQLiteEventDedupStore
+from webhook_receiver import WebhookReceiver
+from webhook_spool import WebhookSpool
+
+# Cargar variables de entorno
+load_dotenv()
+
+WEBHOOK_SECRET = os.getenv('SKYDROPX_WEBHOOK_SECRET', '')
+PORT = int(os.getenv('WEBHOOK_PORT', 3000))
+DEDUP_DB = os.getenv('WEBHOOK_DEDUP_DB', 'skydropx-events.db')
+SPOOL_DIR = os.getenv('WEBHOOK_SPOOL_DIR', 'skydropx-spool')
+
+
+def handle_event(event: dict) -> None:
+    """Procesa un evento ya verificado (corre en un hilo del pool de workers)"""
+    print(f'📨 {event.get("event")} ({event.get("id")})')
+    # Aquí: guardar en DB, notificar al cliente, imprimir guía, etc.
+
+
+def replay(offset=None) -> None:
+    """Vuelve a pasar por handle_event los eventos guardados desde `offset` (default: el checkpoint)"""
+    with WebhookSpool(SPOOL_DIR) as spool:
+        next_offset = spool.replay(handle_event, offset=offset)
+    print(f'✅ Replay completo; siguiente offset: {next_offset}')
+
+
+def main():
+    if len(sys.argv) > 1 and sys.argv[1] == 'replay':
+        replay(int(sys.argv[2]) if len(sys.argv) > 2 else None)
+        return
+
+    if not WEBHOOK_SECRET:
+        print('⚠️  WARNING: WEBHOOK_SECRET no configurado, se aceptan entregas sin firma')
+
+    receiver = WebhookReceiver(
+        handle_event,
+        verifier=WebhookVerifier(WEBHOOK_SECRET) if WEBHOOK_SECRET else None,
+        workers=8,
+        queue_size=10000,
+        dedup=SQLiteEventDedupStore(DEDUP_DB),  # ignora reentregas del mismo evento
+        spool=WebhookSpool(SPOOL_DIR)            # guarda cada evento antes del 200
+    )
+
+    print(f'🔔 Escuchando en http://localhost:{PORT}/webhooks/skydropx')
+    print(f'💚 Salud: http://localhost:{PORT}/health')
+    receiver.run(port=PORT)
+
+
+if __name__ == '__main__':
+    main()
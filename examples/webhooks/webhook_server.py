@@ -2,7 +2,12 @@
 Ejemplo: Servidor de Webhooks con Flask (Python)
 
 Este ejemplo muestra cómo crear un servidor HTTP que recibe webhooks
-de Skydropx con verificación de firma HMAC-SHA512.
+de Skydropx con verificación de firma HMAC-SHA512. Cada evento verificado
+se guarda en un spool en disco antes de responder, así un error del
+handler no lo pierde: el checkpoint del spool solo avanza sobre eventos
+procesados con éxito, y al arrancar se reprocesa lo pendiente con
+SPOOL.replay(). (WebhookReceiver, en webhook_receiver.py, hace este
+seguimiento por su cuenta.)
 
 Instalación:
     pip install flask
@@ -11,10 +16,10 @@ Uso:
     python webhook_server.py
 """
 
+import heapq
 import os
 import sys
-import hmac
-import hashlib
+import threading
 import time
 from pathlib import Path
 
@@ -24,7 +29,8 @@ from dotenv import load_dotenv
 # Agregar el directorio src al path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent.parent / 'src' / 'clients' / 'python'))
 
-from skydropx_client import verify_webhook_signature
+from webhooks import WebhookVerifier, WebhookVerificationError, WebhookDispatcher, WebhookDispatchError
+from webhook_spool import WebhookSpool
 
 # Cargar variables de entorno
 load_dotenv()
@@ -35,64 +41,81 @@ app = Flask(__name__)
 WEBHOOK_SECRET = os.getenv('SKYDROPX_WEBHOOK_SECRET', '')
 PORT = int(os.getenv('WEBHOOK_PORT', 3000))
 
+# Estado HMAC inicializado una sola vez; rechaza timestamps de más de 5 minutos
+VERIFIER = WebhookVerifier(WEBHOOK_SECRET, tolerance=300) if WEBHOOK_SECRET else None
 
-def verify_webhook(request) -> tuple[bool, str]:
-    """
-    Verifica la firma HMAC del webhook
-    
-    Returns:
-        (es_válido, mensaje_error)
+# Log en disco de los eventos recibidos; el fsync se agrupa entre peticiones simultáneas
+SPOOL = WebhookSpool(os.getenv('WEBHOOK_SPOOL_DIR', 'skydropx-spool'))
+
+# Flask atiende peticiones en paralelo: el checkpoint solo avanza hasta el
+# primer offset que sigue abierto (aún en proceso o con error)
+SPOOL_LOCK = threading.Lock()
+OPEN_OFFSETS = []       # heap de offsets guardados y aún sin procesar con éxito
+FINISHED_OFFSETS = set()
+processed_end = SPOOL.committed_offset
+
+
+def spool_event(body: bytes) -> int:
+    """Guarda el evento en el spool (espera el fsync) y lo marca como abierto"""
+    with SPOOL_LOCK:
+        offset = SPOOL.append(body, wait=False)
+        heapq.heappush(OPEN_OFFSETS, offset)
+    SPOOL.wait_durable(offset)
+    return offset
+
+
+def finish_event(offset: int, body: bytes) -> None:
+    """Marca el evento como procesado y avanza el checkpoint por lo contiguo"""
+    global processed_end
+    with SPOOL_LOCK:
+        FINISHED_OFFSETS.add(offset)
+        processed_end = max(processed_end, offset + WebhookSpool.record_size(body))
+        while OPEN_OFFSETS and OPEN_OFFSETS[0] in FINISHED_OFFSETS:
+            FINISHED_OFFSETS.discard(heapq.heappop(OPEN_OFFSETS))
+        SPOOL.commit(OPEN_OFFSETS[0] if OPEN_OFFSETS else processed_end)
+
+
+def verify_webhook(request) -> dict:
     """
-    # Obtener headers
-    signature = request.headers.get('X-Skydropx-Signature', '')
-    timestamp = request.headers.get('X-Skydropx-Timestamp', '')
-    
-    if not signature or not timestamp:
-        return False, 'Missing signature or timestamp'
+    Verifica la firma HMAC del webhook y devuelve el evento
     
-    # Verificar que el timestamp no sea muy antiguo (prevenir replay attacks)
-    try:
-        request_time = int(timestamp)
-        current_time = int(time.time())
-        
-        # Si el timestamp es más de 5 minutos viejo, rechazar
-        if abs(current_time - request_time) > 300:
-            return False, 'Timestamp too old'
-    except ValueError:
-        return False, 'Invalid timestamp'
+    Trabaja sobre los bytes crudos del body: sin decodificar a texto ni
+    concatenar timestamp y payload.
     
-    # Obtener payload
-    payload = request.get_data(as_text=True)
+    Raises:
+        WebhookVerificationError: Firma, timestamp o JSON inválidos
+    """
+    payload = request.get_data()
     
-    # Verificar firma
-    if not WEBHOOK_SECRET:
+    if VERIFIER is None:
         print('⚠️  WARNING: WEBHOOK_SECRET no configurado')
-        return True, ''  # Permitir en desarrollo
-    
-    is_valid = verify_webhook_signature(signature, timestamp, payload, WEBHOOK_SECRET)
-    
-    if not is_valid:
-        return False, 'Invalid signature'
+        return request.get_json()  # Permitir en desarrollo
     
-    return True, ''
+    return VERIFIER.verify_event(
+        request.headers.get('X-Skydropx-Signature'),
+        request.headers.get('X-Skydropx-Timestamp'),
+        payload
+    )
 
 
 @app.route('/webhooks/skydropx', methods=['POST'])
 def handle_webhook():
     """Endpoint principal para recibir webhooks"""
     
-    # Verificar firma
-    is_valid, error_message = verify_webhook(request)
-    
-    if not is_valid:
-        print(f'⚠️  Firma inválida: {error_message}')
-        return jsonify({'error': error_message}), 401
+    # Verificar firma y parsear el evento
+    try:
+        event = verify_webhook(request)
+    except WebhookVerificationError as e:
+        print(f'⚠️  Webhook rechazado: {e}')
+        status = 400 if e.reason == 'invalid_json' else 401
+        return jsonify({'error': str(e)}), status
     
-    # Obtener datos del webhook
+    # Guardar en disco antes de confirmar; si no se puede, que Skydropx reintente
     try:
-        event = request.get_json()
-    except:
-        return jsonify({'error': 'Invalid JSON'}), 400
+        offset = spool_event(request.get_data())
+    except OSError as e:
+        print(f'❌ No se pudo guardar el webhook: {e}')
+        return jsonify({'error': 'Spool no disponible'}), 503
     
     event_type = event.get('event', 'unknown')
     event_id = event.get('id', 'unknown')
@@ -100,31 +123,24 @@ def handle_webhook():
     print('=' * 60)
     print(f'📨 Webhook recibido: {event_type}')
     print(f'   ID: {event_id}')
+    print(f'   Offset en spool: {offset}')
     print(f'   Timestamp: {event.get("created_at", "N/A")}')
     print('=' * 60)
     print()
     
-    # Procesar según el tipo de evento
+    # Procesar según el tipo de evento (ver registro al final del archivo)
     try:
-        if event_type.startswith('shipment.'):
-            handle_shipment_event(event)
-        elif event_type.startswith('package.'):
-            handle_package_event(event)
-        elif event_type.startswith('pickup.'):
-            handle_pickup_event(event)
-        elif event_type.startswith('order.'):
-            handle_order_event(event)
-        elif event_type.startswith('quotation.'):
-            handle_quotation_event(event)
-        else:
+        if not dispatcher.dispatch(event):
             print(f'⚠️  Evento no manejado: {event_type}')
-    except Exception as e:
+    except WebhookDispatchError as e:
         print(f'❌ Error procesando webhook: {e}')
-        # Aún así responder 200 para evitar reintentos
+        # El checkpoint queda en este offset: se reprocesa al reiniciar con SPOOL.replay()
+    else:
+        finish_event(offset, request.get_data())
     
     print()
     
-    # Siempre responder 200 OK
+    # Responder 200 OK: el evento quedó guardado aunque el handler haya fallado
     return jsonify({'received': True}), 200
 
 
@@ -251,6 +267,15 @@ def handle_quotation_event(event: dict):
         print(f'   💵 Tarifas disponibles')
 
 
+# Registro de handlers: cada evento se resuelve con una búsqueda en la tabla del dispatcher
+dispatcher = WebhookDispatcher()
+dispatcher.add('shipment.*', handle_shipment_event)
+dispatcher.add('package.*', handle_package_event)
+dispatcher.add('pickup.*', handle_pickup_event)
+dispatcher.add('order.*', handle_order_event)
+dispatcher.add('quotation.*', handle_quotation_event)
+
+
 @app.route('/health', methods=['GET'])
 def health():
     """Endpoint de salud"""
@@ -301,7 +326,17 @@ def main():
     print('=' * 60)
     print()
     
-    app.run(host='0.0.0.0', port=PORT, debug=True)
+    # Lo que quedó sin procesar antes de detenerse (o con error); el checkpoint avanza
+    if SPOOL.committed_offset < SPOOL.end_offset:
+        print(f'🔁 Reprocesando el spool desde el offset {SPOOL.committed_offset}')
+        try:
+            SPOOL.replay(dispatcher.dispatch)
+        except WebhookDispatchError as e:
+            print(f'❌ Replay detenido: {e}')
+        print()
+    
+    # Sin el reloader: un solo proceso debe escribir en el spool
+    app.run(host='0.0.0.0', port=PORT, debug=True, use_reloader=False)
 
 
 if __name__ == '__main__':
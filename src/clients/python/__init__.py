@@ -9,6 +9,69 @@ from .skydropx_client import (
     SkydropxError,
     verify_webhook_signature
 )
+from .async_client import AsyncSkydropxClient
+from .rate_limit import RateLimiter, SQLiteRateLimiter, RateLimitTimeout
+from .retry import RetryPolicy
+from .idempotency import IdempotencyJournal, SQLiteIdempotencyJournal
+from .cache import TTLCache, QuoteCache, ResponseCache
+from .tracking import BulkTrackingResult, TrackingWatcher, TrackingChange
+from .transport import (
+    Transport,
+    TransportResponse,
+    RequestsTransport,
+    Urllib3Transport,
+    MockTransport
+)
+from .webhooks import (
+    WebhookVerifier,
+    WebhookVerificationError,
+    WebhookDispatcher,
+    WebhookDispatchError,
+    EventDedupStore,
+    SQLiteEventDedupStore
+)
+from .webhook_receiver import WebhookReceiver
+from .webhook_spool import WebhookSpool, SpoolRecord
+from .sync import ShipmentSync, SyncDelta, CursorStore, FileCursorStore
+from .token_store import TokenStore, MemoryTokenStore, FileTokenStore
 
 __version__ = '1.0.0'
-__all__ = ['SkydropxClient', 'SkydropxError', 'verify_webhook_signature']
+__all__ = [
+    'SkydropxClient',
+    'AsyncSkydropxClient',
+    'SkydropxError',
+    'RateLimiter',
+    'SQLiteRateLimiter',
+    'RateLimitTimeout',
+    'RetryPolicy',
+    'IdempotencyJournal',
+    'SQLiteIdempotencyJournal',
+    'TTLCache',
+    'QuoteCache',
+    'ResponseCache',
+    'BulkTrackingResult',
+    'TrackingWatcher',
+    'TrackingChange',
+    'Transport',
+    'TransportResponse',
+    'RequestsTransport',
+    'Urllib3Transport',
+    'MockTransport',
+    'ShipmentSync',
+    'SyncDelta',
+    'CursorStore',
+    'FileCursorStore',
+    'TokenStore',
+    'MemoryTokenStore',
+    'FileTokenStore',
+    'WebhookVerifier',
+    'WebhookVerificationError',
+    'WebhookDispatcher',
+    'WebhookDispatchError',
+    'EventDedupStore',
+    'SQLiteEventDedupStore',
+    'WebhookReceiver',
+    'WebhookSpool',
+    'SpoolRecord',
+    'verify_webhook_signature'
+]
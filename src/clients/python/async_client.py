@@ -0,0 +1,565 @@
+"""
+Cliente asíncrono de Skydropx para Python (asyncio)
+
+Expone la misma superficie que SkydropxClient, pero cada método es una
+corrutina y las peticiones se hacen con aiohttp sobre un pool de conexiones
+compartido, de modo que un solo proceso puede mantener cientos de
+cotizaciones y rastreos en vuelo sin bloquear el event loop.
+
+Instalación:
+    pip install aiohttp
+
+Uso básico:
+    from async_client import AsyncSkydropxClient
+
+    async with AsyncSkydropxClient(
+        client_id='your_client_id',
+        client_secret='your_client_secret',
+        environment='sandbox'
+    ) as client:
+        quotation = await client.create_quotation({...})
+        result = await client.wait_for_quotation(quotation['id'])
+"""
+
+import asyncio
+import itertools
+import time
+from typing import AsyncIterator, Dict, List, Optional
+from datetime import datetime, timedelta
+
+try:
+    import aiohttp
+except ImportError:  # Dependencia opcional
+    aiohttp = None
+
+try:
+    from .skydropx_client import SkydropxClient, SkydropxError, endpoint_template, poll_intervals
+    from .rate_limit import RateLimiter
+    from .retry import RetryPolicy
+except ImportError:  # Importado como módulo suelto (ver examples/)
+    from skydropx_client import SkydropxClient, SkydropxError, endpoint_template, poll_intervals
+    from rate_limit import RateLimiter
+    from retry import RetryPolicy
+
+
+class AsyncSkydropxClient:
+    """
+    Cliente asíncrono para la API de Skydropx
+
+    Args:
+        client_id: Client ID de OAuth
+        client_secret: Client Secret de OAuth
+        environment: 'sandbox' o 'production'
+        auto_renew_token: Si debe renovar automáticamente el token (default: True)
+        max_connections: Conexiones simultáneas máximas del pool (default: 100)
+        session: Sesión de aiohttp existente (opcional, no se cierra al salir)
+        rate_limit: Solicitudes por segundo permitidas (default: 2.0, None para desactivar)
+        rate_limiter: Limitador propio; puede compartirse con un SkydropxClient
+        retry_policy: Política de reintentos (default: RetryPolicy(); None para desactivar)
+    """
+
+    BASE_URLS = SkydropxClient.BASE_URLS
+    ERROR_MESSAGES = SkydropxClient.ERROR_MESSAGES
+
+    def __init__(
+        self,
+        client_id: str,
+        client_secret: str,
+        environment: str = 'sandbox',
+        auto_renew_token: bool = True,
+        max_connections: int = 100,
+        session: Optional['aiohttp.ClientSession'] = None,
+        rate_limit: Optional[float] = 2.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        retry_policy: Optional[RetryPolicy] = RetryPolicy()
+    ):
+        if aiohttp is None:
+            raise ImportError('AsyncSkydropxClient requiere aiohttp - pip install aiohttp')
+
+        self.client_id = client_id
+        self.client_secret = client_secret
+        self.environment = environment
+        self.auto_renew_token = auto_renew_token
+        self.max_connections = max_connections
+
+        if rate_limiter is None and rate_limit:
+            rate_limiter = RateLimiter(rate=rate_limit)
+        self.rate_limiter = rate_limiter
+        self.retry_policy = retry_policy
+        self._retry_counts: Dict[str, int] = {}
+
+        self.base_url = self.BASE_URLS.get(environment, self.BASE_URLS['sandbox'])
+        self.access_token: Optional[str] = None
+        self.token_expires_at: Optional[datetime] = None
+
+        self.headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'Skydropx-Python-SDK/1.0.0'
+        }
+
+        self._session = session
+        self._owns_session = session is None
+        self._token_lock: Optional[asyncio.Lock] = None
+
+    async def __aenter__(self) -> 'AsyncSkydropxClient':
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> 'aiohttp.ClientSession':
+        """Sesión HTTP compartida (se crea al primer uso, dentro del event loop)"""
+        if self._session is None or self._session.closed:
+            connector = aiohttp.TCPConnector(limit=self.max_connections)
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                headers=self.headers,
+                timeout=aiohttp.ClientTimeout(total=30)
+            )
+            self._owns_session = True
+        return self._session
+
+    async def close(self) -> None:
+        """Cierra la sesión HTTP y libera las conexiones del pool"""
+        if self._owns_session and self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
+
+    def _should_renew_token(self) -> bool:
+        """Verifica si el token debe renovarse"""
+        if not self.access_token or not self.token_expires_at:
+            return True
+
+        # Renovar 5 minutos antes de expirar
+        return datetime.now() >= (self.token_expires_at - timedelta(minutes=5))
+
+    async def _ensure_token(self) -> None:
+        """Renueva el token una sola vez aunque haya muchas corrutinas esperando"""
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+
+        async with self._token_lock:
+            if self._should_renew_token():
+                await self.authenticate()
+
+    def _handle_error(self, status_code: int, error_data: Dict) -> None:
+        """Maneja errores de la API"""
+        message = self.ERROR_MESSAGES.get(status_code, f'Error {status_code}')
+
+        raise SkydropxError(
+            message=message,
+            status_code=status_code,
+            response_data=error_data
+        )
+
+    async def _request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        requires_auth: bool = True
+    ) -> Dict:
+        """Realiza una petición a la API"""
+
+        # Renovar token si es necesario
+        if requires_auth and self.auto_renew_token and self._should_renew_token():
+            await self._ensure_token()
+
+        # Configurar headers
+        headers = {}
+        if requires_auth and self.access_token:
+            headers['Authorization'] = f'Bearer {self.access_token}'
+
+        # Realizar petición (con reintentos según retry_policy)
+        url = f"{self.base_url}{endpoint}"
+        method = method.upper()
+        started_at = time.monotonic()
+        attempt = 0
+
+        while True:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire_async(endpoint)
+
+            try:
+                async with self.session.request(
+                    method,
+                    url,
+                    json=data,
+                    params=params,
+                    headers=headers
+                ) as response:
+                    body = await response.read()
+
+                    if response.status < 400:
+                        return await response.json(content_type=None) if body else {}
+
+                    delay = self._next_retry_delay(
+                        method, attempt, started_at, response.status, response.headers.get('Retry-After')
+                    )
+                    if delay is None:
+                        try:
+                            error_data = await response.json(content_type=None)
+                        except Exception:
+                            error_data = {'error': body.decode('utf-8', 'replace')}
+                        self._handle_error(response.status, error_data)
+
+            except asyncio.TimeoutError:
+                delay = self._next_retry_delay(method, attempt, started_at)
+                if delay is None:
+                    raise SkydropxError('Timeout - La solicitud tardó demasiado')
+            except aiohttp.ClientConnectionError:
+                delay = self._next_retry_delay(method, attempt, started_at)
+                if delay is None:
+                    raise SkydropxError('Error de conexión - Verifica tu internet')
+            except SkydropxError:
+                raise
+            except Exception as e:
+                raise SkydropxError(f'Error inesperado: {str(e)}')
+
+            attempt += 1
+            key = f'{method} {endpoint_template(endpoint)}'
+            self._retry_counts[key] = self._retry_counts.get(key, 0) + 1
+            await asyncio.sleep(delay)
+
+    def _next_retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        started_at: float,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None
+    ) -> Optional[float]:
+        """Segundos a esperar antes de reintentar, o None si no se reintenta"""
+        if self.retry_policy is None:
+            return None
+
+        return self.retry_policy.next_delay(
+            method,
+            attempt,
+            started_at,
+            status_code=status_code,
+            retry_after=retry_after
+        )
+
+    # ============= AUTENTICACIÓN =============
+
+    async def authenticate(self) -> Dict:
+        """
+        Obtiene un access token de OAuth
+
+        Returns:
+            Dict con información del token
+        """
+        data = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'grant_type': 'client_credentials'
+        }
+
+        response = await self._request(
+            'POST',
+            '/api/v1/oauth/token',
+            data=data,
+            requires_auth=False
+        )
+
+        self.access_token = response['access_token']
+        expires_in = response.get('expires_in', 7200)
+        self.token_expires_at = datetime.now() + timedelta(seconds=expires_in)
+
+        return response
+
+    async def revoke_token(self) -> Dict:
+        """Revoca el token actual"""
+        data = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'token': self.access_token,
+            'token_type_hint': 'access_token'
+        }
+
+        response = await self._request(
+            'POST',
+            '/api/v1/oauth/revoke',
+            data=data,
+            requires_auth=False
+        )
+
+        self.access_token = None
+        self.token_expires_at = None
+
+        return response
+
+    async def introspect_token(self) -> Dict:
+        """Obtiene información del token actual"""
+        data = {
+            'client_id': self.client_id,
+            'client_secret': self.client_secret,
+            'token': self.access_token,
+            'token_type_hint': 'access_token'
+        }
+
+        return await self._request(
+            'POST',
+            '/api/v1/oauth/introspect',
+            data=data,
+            requires_auth=False
+        )
+
+    # ============= COTIZACIONES =============
+
+    async def create_quotation(self, quotation_data: Dict) -> Dict:
+        """Crea una cotización"""
+        return await self._request(
+            'POST',
+            '/api/v1/quotations',
+            data={'quotation': quotation_data}
+        )
+
+    async def get_quotation(self, quotation_id: str) -> Dict:
+        """Obtiene los resultados de una cotización"""
+        return await self._request(
+            'GET',
+            f'/api/v1/quotations/{quotation_id}'
+        )
+
+    async def _poll_quotation(
+        self,
+        quotation_id: str,
+        max_attempts: Optional[int],
+        sleep_seconds: Optional[float],
+        timeout: Optional[float]
+    ) -> AsyncIterator[Dict]:
+        """Consulta la cotización hasta que se complete (ver SkydropxClient._poll_quotation)"""
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        intervals = itertools.repeat(sleep_seconds) if sleep_seconds is not None else poll_intervals()
+        attempts = 0
+
+        while True:
+            quotation = await self.get_quotation(quotation_id)
+            attempts += 1
+
+            yield quotation
+
+            if quotation.get('is_completed'):
+                return
+
+            if max_attempts is not None and attempts >= max_attempts:
+                break
+
+            delay = next(intervals)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+
+            await asyncio.sleep(delay)
+
+        raise SkydropxError('Timeout esperando cotización - Intenta más tarde')
+
+    async def wait_for_quotation(
+        self,
+        quotation_id: str,
+        max_attempts: Optional[int] = None,
+        sleep_seconds: Optional[float] = None,
+        timeout: Optional[float] = 30.0
+    ) -> Dict:
+        """
+        Espera a que una cotización se complete (polling sin bloquear el event loop)
+
+        Args:
+            quotation_id: ID de la cotización
+            max_attempts: Número máximo de intentos (default: sin límite, solo timeout)
+            sleep_seconds: Segundos fijos entre intentos (default: intervalos adaptativos)
+            timeout: Plazo total en segundos (default: 30)
+
+        Returns:
+            Dict con cotización completada
+        """
+        async for quotation in self._poll_quotation(quotation_id, max_attempts, sleep_seconds, timeout):
+            if quotation.get('is_completed'):
+                return quotation
+
+    async def iter_quotation_rates(
+        self,
+        quotation_id: str,
+        sleep_seconds: Optional[float] = None,
+        timeout: Optional[float] = 30.0
+    ) -> AsyncIterator[Dict]:
+        """Entrega las tarifas conforme cada paquetería responde (async for)"""
+        seen = set()
+
+        async for quotation in self._poll_quotation(quotation_id, None, sleep_seconds, timeout):
+            for rate in quotation.get('rates') or []:
+                rate_id = rate.get('id')
+                if rate_id in seen or rate.get('success') is False:
+                    continue
+                seen.add(rate_id)
+                yield rate
+
+    # ============= ENVÍOS =============
+
+    async def create_shipment(self, shipment_data: Dict) -> Dict:
+        """Crea un envío"""
+        return await self._request(
+            'POST',
+            '/api/v1/shipments',
+            data={'shipment': shipment_data}
+        )
+
+    async def get_shipments(self, params: Optional[Dict] = None) -> Dict:
+        """Lista envíos con filtros opcionales"""
+        return await self._request(
+            'GET',
+            '/api/v1/shipments',
+            params=params
+        )
+
+    async def get_shipment(self, shipment_id: str) -> Dict:
+        """Obtiene un envío por ID"""
+        return await self._request(
+            'GET',
+            f'/api/v1/shipments/{shipment_id}'
+        )
+
+    async def cancel_shipment(self, shipment_id: str, reason: str = '') -> Dict:
+        """Cancela un envío"""
+        return await self._request(
+            'POST',
+            f'/api/v1/shipments/{shipment_id}/cancel',
+            data={'cancellation_reason': reason}
+        )
+
+    async def protect_shipment(self, shipment_id: str, declared_value: float) -> Dict:
+        """Agrega seguro a un envío"""
+        return await self._request(
+            'POST',
+            f'/api/v1/shipments/{shipment_id}/protect',
+            data={'declared_value': declared_value}
+        )
+
+    # ============= RASTREO =============
+
+    async def track_shipment(self, tracking_number: str, carrier_code: str) -> Dict:
+        """Rastrea un envío"""
+        return await self._request(
+            'GET',
+            '/api/v1/tracking',
+            params={
+                'tracking_number': tracking_number,
+                'carrier_code': carrier_code
+            }
+        )
+
+    async def track_multiple_shipments(self, trackings: List[Dict]) -> Dict:
+        """Rastrea múltiples envíos"""
+        return await self._request(
+            'POST',
+            '/api/v1/tracking/bulk',
+            data={'trackings': trackings}
+        )
+
+    # ============= RECOLECCIONES =============
+
+    async def get_pickup_coverage(self, postal_code: str, country_code: str = 'MX') -> Dict:
+        """Verifica cobertura de recolección"""
+        return await self._request(
+            'POST',
+            '/api/v1/pickup_coverage',
+            data={
+                'zip': postal_code,
+                'country_code': country_code
+            }
+        )
+
+    async def create_pickup(self, pickup_data: Dict) -> Dict:
+        """Programa una recolección"""
+        return await self._request(
+            'POST',
+            '/api/v1/pickups',
+            data={'pickup': pickup_data}
+        )
+
+    async def get_pickups(self, params: Optional[Dict] = None) -> Dict:
+        """Lista recolecciones"""
+        return await self._request(
+            'GET',
+            '/api/v1/pickups',
+            params=params
+        )
+
+    async def get_pickup(self, pickup_id: str) -> Dict:
+        """Obtiene una recolección por ID"""
+        return await self._request(
+            'GET',
+            f'/api/v1/pickups/{pickup_id}'
+        )
+
+    async def reschedule_pickup(self, pickup_id: str, pickup_data: Dict) -> Dict:
+        """Reprograma una recolección"""
+        return await self._request(
+            'PUT',
+            f'/api/v1/pickups/{pickup_id}/reschedule',
+            data=pickup_data
+        )
+
+    # ============= WEBHOOKS =============
+
+    async def create_webhook(self, webhook_data: Dict) -> Dict:
+        """Registra un webhook"""
+        return await self._request(
+            'POST',
+            '/api/v1/webhooks',
+            data={'webhook': webhook_data}
+        )
+
+    async def get_webhooks(self) -> Dict:
+        """Lista webhooks registrados"""
+        return await self._request(
+            'GET',
+            '/api/v1/webhooks'
+        )
+
+    async def update_webhook(self, webhook_id: str, webhook_data: Dict) -> Dict:
+        """Actualiza un webhook"""
+        return await self._request(
+            'PUT',
+            f'/api/v1/webhooks/{webhook_id}',
+            data={'webhook': webhook_data}
+        )
+
+    async def delete_webhook(self, webhook_id: str) -> Dict:
+        """Elimina un webhook"""
+        return await self._request(
+            'DELETE',
+            f'/api/v1/webhooks/{webhook_id}'
+        )
+
+    # ============= UTILIDADES =============
+
+    def get_client_info(self) -> Dict:
+        """
+        Obtiene información del cliente
+
+        Returns:
+            Dict con información de configuración
+        """
+        return {
+            'environment': self.environment,
+            'base_url': self.base_url,
+            'has_valid_token': bool(self.access_token and not self._should_renew_token()),
+            'token_expires_at': self.token_expires_at.isoformat() if self.token_expires_at else None
+        }
+
+    def get_retry_stats(self) -> Dict[str, int]:
+        """
+        Obtiene cuántas veces se reintentó cada endpoint
+
+        Returns:
+            Dict 'MÉTODO /ruta/{id}' -> número de reintentos
+        """
+        return dict(self._retry_counts)
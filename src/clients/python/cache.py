@@ -0,0 +1,433 @@
+"""
+Cachés en memoria para el cliente de Skydropx
+
+QuoteCache guarda cotizaciones completadas por "ruta" normalizada (códigos
+postales de origen y destino más peso y dimensiones redondeados), de modo
+que una cotización repetida se resuelve en microsegundos en lugar de
+repetir el ciclo crear + polling.
+
+Uso:
+    from cache import QuoteCache
+
+    client = SkydropxClient(..., quote_cache=QuoteCache(ttl=300, max_entries=10000))
+    quotation = client.quote(quotation_data)
+
+ResponseCache es una caché HTTP para los GET de _request: guarda ETag y
+Last-Modified, envía If-None-Match / If-Modified-Since y reutiliza el body
+guardado cuando el servidor responde 304.
+
+    client = SkydropxClient(..., response_cache=ResponseCache(max_bytes=32 * 1024 * 1024))
+"""
+
+import copy
+import hashlib
+import json
+import math
+import os
+import tempfile
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    Caché LRU thread-safe con expiración por entrada
+
+    Args:
+        ttl: Segundos de vida de cada entrada
+        max_entries: Entradas máximas; al exceder se descarta la menos usada
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: 'OrderedDict[Hashable, Tuple[float, Any]]' = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Obtiene el valor de `key`, o None si no existe o expiró"""
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None or entry[0] <= now:
+                if entry is not None:
+                    del self._entries[key]
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Guarda `value` con el TTL por defecto o uno propio"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def add(self, key: Hashable, value: Any = True, ttl: Optional[float] = None) -> bool:
+        """
+        Guarda `value` solo si `key` no existe (o ya expiró), de forma atómica
+
+        Returns:
+            True si se guardó, False si `key` ya estaba vigente
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return False
+
+            self.misses += 1
+            self._entries[key] = (now + (self.ttl if ttl is None else ttl), value)
+            self._entries.move_to_end(key)
+
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+            return True
+
+    def delete(self, key: Hashable) -> None:
+        """Elimina `key` si existe"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        """Vacía la caché"""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Estadísticas de uso
+
+        Returns:
+            Dict con hits, misses, hit_rate, evictions y size
+        """
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.0,
+                'evictions': self.evictions,
+                'size': len(self._entries)
+            }
+
+
+class QuoteCache(TTLCache):
+    """
+    Caché de cotizaciones completadas por ruta normalizada
+
+    La llave combina país y código postal de origen y destino con el peso y
+    las dimensiones de cada paquete redondeados hacia arriba a múltiplos de
+    `weight_step` y `dimension_step`. Dos carritos en el mismo bucket
+    comparten cotización, así que conviene usar buckets finos si los
+    precios varían mucho con el peso.
+
+    Los rate_id de una cotización en caché siguen siendo los de la
+    cotización original; mantén el TTL por debajo de su vigencia.
+
+    Args:
+        ttl: Segundos de vida de cada cotización (default: 300)
+        max_entries: Cotizaciones máximas en caché (default: 10000)
+        weight_step: Tamaño del bucket de peso en kg (default: 0.5)
+        dimension_step: Tamaño del bucket de dimensiones en cm (default: 5)
+    """
+
+    def __init__(
+        self,
+        ttl: float = 300,
+        max_entries: int = 10000,
+        weight_step: float = 0.5,
+        dimension_step: float = 5
+    ):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.weight_step = weight_step
+        self.dimension_step = dimension_step
+
+    @staticmethod
+    def _bucket(value: Any, step: float) -> float:
+        """Redondea hacia arriba al múltiplo de `step`"""
+        try:
+            value = float(value)
+        except (TypeError, ValueError):
+            return 0.0
+        return math.ceil(round(value / step, 9)) * step
+
+    @staticmethod
+    def _address_key(address: Optional[Dict]) -> Tuple[str, str]:
+        address = address or {}
+        postal_code = str(address.get('postal_code') or address.get('zip') or '').strip().upper()
+        country = str(address.get('country_code') or 'MX').strip().upper()
+        return country, postal_code
+
+    def key_for(self, quotation_data: Dict) -> Tuple:
+        """Llave normalizada de una cotización"""
+        packages = tuple(sorted(
+            (
+                self._bucket(package.get('weight'), self.weight_step),
+                # Orden de dimensiones irrelevante: 30x20x15 == 15x20x30
+                tuple(sorted(
+                    self._bucket(package.get(dim), self.dimension_step)
+                    for dim in ('length', 'width', 'height')
+                ))
+            )
+            for package in quotation_data.get('packages') or []
+        ))
+
+        # Cotizaciones internacionales: los productos declarados cambian la tarifa
+        products = json.dumps(quotation_data.get('products') or [], sort_keys=True, default=str)
+
+        return (
+            self._address_key(quotation_data.get('address_from')),
+            self._address_key(quotation_data.get('address_to')),
+            packages,
+            products
+        )
+
+    def get_quotation(self, quotation_data: Dict) -> Optional[Dict]:
+        """Obtiene una copia de la cotización en caché para estos datos, o None"""
+        quotation = self.get(self.key_for(quotation_data))
+        return copy.deepcopy(quotation) if quotation is not None else None
+
+    def set_quotation(self, quotation_data: Dict, quotation: Dict) -> None:
+        """Guarda una cotización completada"""
+        self.set(self.key_for(quotation_data), copy.deepcopy(quotation))
+
+
+class CachedResponse:
+    """
+    Respuesta GET guardada en ResponseCache
+
+    Attributes:
+        body: Body crudo de la respuesta
+        etag: Header ETag (si vino)
+        last_modified: Header Last-Modified (si vino)
+        stored_at: time.time() en que se guardó o revalidó
+        expires_at: time.time() hasta el que se usa sin consultar (solo sin validadores)
+    """
+
+    __slots__ = ('body', 'etag', 'last_modified', 'stored_at', 'expires_at')
+
+    def __init__(
+        self,
+        body: bytes,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        stored_at: float,
+        expires_at: float
+    ):
+        self.body = body
+        self.etag = etag
+        self.last_modified = last_modified
+        self.stored_at = stored_at
+        self.expires_at = expires_at
+
+    @property
+    def has_validators(self) -> bool:
+        return bool(self.etag or self.last_modified)
+
+    def to_dict(self) -> Dict:
+        return {
+            'body': self.body.decode('utf-8'),
+            'etag': self.etag,
+            'last_modified': self.last_modified,
+            'stored_at': self.stored_at,
+            'expires_at': self.expires_at
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> 'CachedResponse':
+        return cls(
+            data['body'].encode('utf-8'),
+            data.get('etag'),
+            data.get('last_modified'),
+            data['stored_at'],
+            data['expires_at']
+        )
+
+
+class ResponseCache:
+    """
+    Caché HTTP condicional para peticiones GET
+
+    - Con ETag / Last-Modified: cada GET se revalida con If-None-Match /
+      If-Modified-Since y un 304 reutiliza el body guardado (sin volver a
+      descargarlo).
+    - Sin validadores: la respuesta se reutiliza sin consultar durante
+      `ttl` segundos.
+    - Los prefijos de `revalidate_only` nunca se sirven por TTL (por defecto
+      las cotizaciones, cuyo estado cambia mientras se hace polling).
+    - Un POST/PUT/DELETE exitoso invalida el uso por TTL de las respuestas
+      del mismo recurso (ej. cancel_shipment invalida /api/v1/shipments).
+
+    La capa en memoria es LRU acotada por `max_bytes`; con `directory` se
+    agrega una capa en disco que sobrevive reinicios.
+
+    Args:
+        ttl: Segundos de reutilización sin validadores (default: 5)
+        max_bytes: Tamaño máximo de los bodies en memoria (default: 16 MB)
+        directory: Carpeta de la capa en disco (opcional)
+        revalidate_only: Prefijos que solo se cachean con validadores
+    """
+
+    def __init__(
+        self,
+        ttl: float = 5.0,
+        max_bytes: int = 16 * 1024 * 1024,
+        directory: Optional[str] = None,
+        revalidate_only: Tuple[str, ...] = ('/api/v1/quotations',)
+    ):
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.directory = os.path.expanduser(directory) if directory else None
+        self.revalidate_only = revalidate_only
+
+        self._entries: 'OrderedDict[str, CachedResponse]' = OrderedDict()
+        self._size = 0
+        self._invalidated_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+        if self.directory:
+            os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def resource_of(endpoint: str) -> str:
+        """Colección a la que pertenece un endpoint ('/api/v1/shipments/1/cancel' -> '/api/v1/shipments')"""
+        return '/'.join(endpoint.split('?', 1)[0].split('/')[:4])
+
+    def _disk_path(self, key: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(key.encode('utf-8')).hexdigest() + '.json')
+
+    def _store_memory(self, key: str, entry: CachedResponse) -> None:
+        # Debe llamarse con self._lock tomado
+        previous = self._entries.pop(key, None)
+        if previous is not None:
+            self._size -= len(previous.body)
+
+        if len(entry.body) > self.max_bytes:
+            return
+
+        self._entries[key] = entry
+        self._size += len(entry.body)
+
+        while self._size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self._size -= len(evicted.body)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """Obtiene la respuesta guardada (memoria y luego disco), o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry
+
+        if not self.directory:
+            return None
+
+        try:
+            with open(self._disk_path(key), 'r', encoding='utf-8') as f:
+                entry = CachedResponse.from_dict(json.load(f))
+        except (FileNotFoundError, ValueError, KeyError):
+            return None
+
+        with self._lock:
+            self._store_memory(key, entry)
+        return entry
+
+    def is_fresh(self, endpoint: str, entry: CachedResponse) -> bool:
+        """Indica si `entry` puede usarse sin consultar al servidor"""
+        if entry.has_validators or endpoint.startswith(self.revalidate_only):
+            return False
+        if entry.stored_at <= self._invalidated_at.get(self.resource_of(endpoint), 0.0):
+            return False
+        return time.time() < entry.expires_at
+
+    def conditional_headers(self, entry: Optional[CachedResponse]) -> Dict[str, str]:
+        """Headers If-None-Match / If-Modified-Since para revalidar `entry`"""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers['If-None-Match'] = entry.etag
+            if entry.last_modified:
+                headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def store(self, key: str, body: bytes, etag: Optional[str], last_modified: Optional[str]) -> None:
+        """Guarda una respuesta 200"""
+        now = time.time()
+        entry = CachedResponse(body, etag, last_modified, now, now + self.ttl)
+
+        with self._lock:
+            self._store_memory(key, entry)
+
+        if self.directory:
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(entry.to_dict(), f)
+                os.replace(tmp_path, self._disk_path(key))
+            except (OSError, UnicodeDecodeError):
+                os.unlink(tmp_path)
+
+    def record(self, outcome: str) -> None:
+        """Cuenta un uso: 'hit' (TTL), 'revalidated' (304) o 'miss'"""
+        with self._lock:
+            if outcome == 'hit':
+                self.hits += 1
+            elif outcome == 'revalidated':
+                self.revalidated += 1
+            else:
+                self.misses += 1
+
+    def invalidate(self, endpoint: str) -> None:
+        """Deja de servir por TTL las respuestas del recurso de `endpoint`"""
+        with self._lock:
+            self._invalidated_at[self.resource_of(endpoint)] = time.time()
+
+    def clear(self) -> None:
+        """Vacía la capa en memoria"""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Estadísticas de uso
+
+        Returns:
+            Dict con hits (TTL), revalidated (304), misses, entries y bytes en memoria
+        """
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'revalidated': self.revalidated,
+                'misses': self.misses,
+                'entries': len(self._entries),
+                'bytes': self._size
+            }
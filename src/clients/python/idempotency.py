@@ -0,0 +1,149 @@
+"""
+Bitácora de idempotencia para create_shipment y create_pickup
+
+Reintentar un POST tras un timeout puede generar dos guías cobradas: el
+primer POST pudo llegar al servidor aunque el cliente vio un error. La
+bitácora registra cada creación en vuelo bajo su idempotency key; un
+reintento con la misma llave busca primero el recurso existente antes de
+volver a hacer POST.
+
+Uso:
+    from idempotency import SQLiteIdempotencyJournal
+
+    client = SkydropxClient(
+        ...,
+        idempotency_journal=SQLiteIdempotencyJournal('/var/lib/app/skydropx-journal.db')
+    )
+    client.create_shipment(data, idempotency_key=f'order-{order_id}')
+"""
+
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+try:
+    from .sqlite_connections import SQLiteConnections
+except ImportError:  # Importado como módulo suelto (ver examples/)
+    from sqlite_connections import SQLiteConnections
+
+
+class IdempotencyJournal:
+    """
+    Bitácora en memoria de creaciones en vuelo
+
+    Cada entrada es un dict con key, kind ('shipment' o 'pickup'), state
+    ('pending' o 'completed'), resource_id y created_at (epoch seconds).
+    """
+
+    PENDING = 'pending'
+    COMPLETED = 'completed'
+
+    def __init__(self):
+        self._entries: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Obtiene la entrada de `key`, o None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            return dict(entry) if entry else None
+
+    def begin(self, key: str, kind: str) -> Dict:
+        """
+        Registra una creación pendiente
+
+        Si ya existe una entrada para `key` la devuelve sin modificarla.
+        """
+        with self._lock:
+            entry = self._entries.setdefault(key, {
+                'key': key,
+                'kind': kind,
+                'state': self.PENDING,
+                'resource_id': None,
+                'created_at': time.time()
+            })
+            return dict(entry)
+
+    def complete(self, key: str, resource_id: Optional[str]) -> None:
+        """Marca la creación como confirmada con el ID del recurso"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry:
+                entry['state'] = self.COMPLETED
+                entry['resource_id'] = resource_id
+
+    def discard(self, key: str) -> None:
+        """Elimina la entrada (el servidor rechazó la creación)"""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def purge(self, max_age: float) -> int:
+        """
+        Elimina entradas con más de `max_age` segundos
+
+        Returns:
+            Número de entradas eliminadas
+        """
+        cutoff = time.time() - max_age
+        with self._lock:
+            expired = [key for key, entry in self._entries.items() if entry['created_at'] < cutoff]
+            for key in expired:
+                del self._entries[key]
+        return len(expired)
+
+
+class SQLiteIdempotencyJournal(IdempotencyJournal):
+    """
+    Bitácora persistente en SQLite
+
+    Sobrevive reinicios y puede compartirse entre procesos: si un worker
+    muere a mitad de un create_shipment, el reintento desde otro proceso
+    encuentra la entrada pendiente y busca el envío antes de duplicarlo.
+
+    Args:
+        path: Ruta del archivo SQLite (se crea si no existe)
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._connections = SQLiteConnections(path, row_factory=sqlite3.Row)
+
+        conn = self._connections.get()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS idempotency_journal ('
+            'key TEXT PRIMARY KEY, kind TEXT NOT NULL, state TEXT NOT NULL, '
+            'resource_id TEXT, created_at REAL NOT NULL)'
+        )
+
+    def get(self, key: str) -> Optional[Dict]:
+        row = self._connections.get().execute(
+            'SELECT * FROM idempotency_journal WHERE key = ?', (key,)
+        ).fetchone()
+        return dict(row) if row else None
+
+    def begin(self, key: str, kind: str) -> Dict:
+        conn = self._connections.get()
+        conn.execute(
+            'INSERT OR IGNORE INTO idempotency_journal (key, kind, state, resource_id, created_at) '
+            'VALUES (?, ?, ?, NULL, ?)',
+            (key, kind, self.PENDING, time.time())
+        )
+        return self.get(key)
+
+    def complete(self, key: str, resource_id: Optional[str]) -> None:
+        self._connections.get().execute(
+            'UPDATE idempotency_journal SET state = ?, resource_id = ? WHERE key = ?',
+            (self.COMPLETED, resource_id, key)
+        )
+
+    def discard(self, key: str) -> None:
+        self._connections.get().execute('DELETE FROM idempotency_journal WHERE key = ?', (key,))
+
+    def purge(self, max_age: float) -> int:
+        cursor = self._connections.get().execute(
+            'DELETE FROM idempotency_journal WHERE created_at < ?',
+            (time.time() - max_age,)
+        )
+        return cursor.rowcount
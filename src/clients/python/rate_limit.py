@@ -0,0 +1,273 @@
+"""
+Limitador de tasa (token bucket) para el cliente de Skydropx
+
+La API permite 2 solicitudes por segundo por cuenta. En lugar de disparar
+peticiones y recibir 429, el cliente reserva un token antes de cada petición
+y espera localmente el tiempo necesario.
+
+Uso:
+    from rate_limit import RateLimiter
+
+    limiter = RateLimiter(
+        rate=2.0,
+        endpoint_limits={'/api/v1/tracking': 1.0}
+    )
+    client = SkydropxClient(..., rate_limiter=limiter)
+
+Para varios procesos en el mismo host (gunicorn, celery), SQLiteRateLimiter
+guarda los buckets en un archivo compartido, así todos los workers consumen
+del mismo presupuesto sin depender de Redis ni de otro servicio:
+
+    limiter = SQLiteRateLimiter('/tmp/skydropx-ratelimit.db', rate=2.0)
+"""
+
+import asyncio
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple, Union
+
+try:
+    from .sqlite_connections import SQLiteConnections
+except ImportError:  # Importado como módulo suelto (ver examples/)
+    from sqlite_connections import SQLiteConnections
+
+
+class RateLimitTimeout(Exception):
+    """La espera en el limitador excede el máximo permitido (ver acquire(max_wait=...))"""
+
+    def __init__(self, wait: float):
+        self.wait = wait
+        super().__init__(f'El limitador requiere esperar {wait:.3f}s')
+
+
+class RateLimiter:
+    """
+    Token bucket thread-safe con buckets opcionales por endpoint
+
+    Cada petición consume un token del bucket global y, si su endpoint
+    coincide con algún prefijo de `endpoint_limits`, también del bucket de
+    ese prefijo. La espera es el máximo de ambas.
+
+    Args:
+        rate: Tokens por segundo del bucket global (default: 2.0)
+        burst: Capacidad máxima del bucket (default: igual a rate, mínimo 1)
+        endpoint_limits: Dict prefijo -> rate o (rate, burst)
+    """
+
+    GLOBAL_KEY = '*'
+
+    def __init__(
+        self,
+        rate: float = 2.0,
+        burst: Optional[float] = None,
+        endpoint_limits: Optional[Dict[str, Union[float, Tuple[float, float]]]] = None
+    ):
+        if rate <= 0:
+            raise ValueError('rate debe ser mayor a 0')
+
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self.endpoint_limits: Dict[str, Tuple[float, float]] = {}
+
+        for prefix, limit in (endpoint_limits or {}).items():
+            if isinstance(limit, (tuple, list)):
+                prefix_rate, prefix_burst = limit
+            else:
+                prefix_rate, prefix_burst = limit, max(1.0, limit)
+            self.endpoint_limits[prefix] = (float(prefix_rate), float(prefix_burst))
+
+        # Prefijos más largos primero para que gane el más específico
+        self._prefixes = sorted(self.endpoint_limits, key=len, reverse=True)
+
+        self._lock = threading.Lock()
+        self._buckets: Dict[str, List[float]] = {}
+        self._stats: Dict[str, Dict[str, float]] = {}
+
+    def _limits_for(self, endpoint: str) -> List[Tuple[str, float, float]]:
+        """Buckets que debe consumir una petición a `endpoint`"""
+        limits = [(self.GLOBAL_KEY, self.rate, self.burst)]
+
+        for prefix in self._prefixes:
+            if endpoint.startswith(prefix):
+                prefix_rate, prefix_burst = self.endpoint_limits[prefix]
+                limits.append((prefix, prefix_rate, prefix_burst))
+                break
+
+        return limits
+
+    def _reserve(self, key: str, rate: float, burst: float) -> float:
+        """
+        Reserva un token del bucket `key`
+
+        Returns:
+            Segundos que hay que esperar antes de usar el token
+        """
+        now = time.monotonic()
+
+        with self._lock:
+            tokens, updated_at = self._buckets.get(key, (burst, now))
+            tokens = min(burst, tokens + (now - updated_at) * rate) - 1
+            self._buckets[key] = [tokens, now]
+
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def _release(self, key: str) -> None:
+        """Devuelve al bucket `key` un token reservado que no se usará"""
+        with self._lock:
+            if key in self._buckets:
+                self._buckets[key][0] += 1
+
+    def reserve(self, endpoint: str = '') -> float:
+        """
+        Reserva un token sin bloquear
+
+        El token queda apartado aunque haya que esperar; quien llama debe
+        dormir los segundos devueltos antes de hacer la petición.
+
+        Args:
+            endpoint: Ruta de la petición (ej. '/api/v1/tracking')
+
+        Returns:
+            Segundos de espera
+        """
+        return max(self._reserve_all(endpoint).values())
+
+    def _reserve_all(self, endpoint: str) -> Dict[str, float]:
+        """Reserva en todos los buckets de `endpoint` y devuelve la espera de cada uno"""
+        return {key: self._reserve(key, rate, burst) for key, rate, burst in self._limits_for(endpoint)}
+
+    def _record(self, delays: Dict[str, float]) -> None:
+        """Acumula estadísticas de espera por bucket"""
+        with self._lock:
+            for key, waited in delays.items():
+                stats = self._stats.setdefault(key, {'requests': 0, 'delayed': 0, 'total_wait': 0.0, 'max_wait': 0.0})
+                stats['requests'] += 1
+                if waited > 0:
+                    stats['delayed'] += 1
+                    stats['total_wait'] += waited
+                    stats['max_wait'] = max(stats['max_wait'], waited)
+
+    def acquire(self, endpoint: str = '', max_wait: Optional[float] = None) -> float:
+        """
+        Espera (bloqueando el hilo) hasta que haya un token disponible
+
+        Args:
+            endpoint: Ruta de la petición
+            max_wait: Espera máxima aceptable; si se requiere más, devuelve los
+                tokens reservados y lanza RateLimitTimeout sin esperar
+
+        Returns:
+            Segundos que la petición estuvo en cola
+        """
+        delays = self._reserve_all(endpoint)
+        waited = max(delays.values())
+        if max_wait is not None and waited > max_wait:
+            for key in delays:
+                self._release(key)
+            raise RateLimitTimeout(waited)
+        if waited > 0:
+            time.sleep(waited)
+        self._record(delays)
+        return waited
+
+    async def acquire_async(self, endpoint: str = '') -> float:
+        """Igual que acquire(), pero sin bloquear el event loop"""
+        delays = self._reserve_all(endpoint)
+        waited = max(delays.values())
+        if waited > 0:
+            await asyncio.sleep(waited)
+        self._record(delays)
+        return waited
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """
+        Estadísticas de espera por bucket
+
+        Returns:
+            Dict bucket -> {requests, delayed, total_wait, max_wait}
+        """
+        with self._lock:
+            return {key: dict(stats) for key, stats in self._stats.items()}
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    Token bucket compartido entre procesos mediante un archivo SQLite
+
+    Cada reserva es una transacción `BEGIN IMMEDIATE`, que toma el lock de
+    escritura del archivo: la lectura y actualización del bucket son
+    atómicas aunque muchos procesos reserven al mismo tiempo. Las
+    estadísticas de espera siguen siendo locales a cada proceso.
+
+    Args:
+        path: Ruta del archivo SQLite (se crea si no existe)
+        rate: Tokens por segundo del bucket global (default: 2.0)
+        burst: Capacidad máxima del bucket (default: igual a rate, mínimo 1)
+        endpoint_limits: Dict prefijo -> rate o (rate, burst)
+        lock_timeout: Segundos máximos esperando el lock del archivo (default: 10)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        rate: float = 2.0,
+        burst: Optional[float] = None,
+        endpoint_limits: Optional[Dict[str, Union[float, Tuple[float, float]]]] = None,
+        lock_timeout: float = 10.0
+    ):
+        super().__init__(rate=rate, burst=burst, endpoint_limits=endpoint_limits)
+        self.path = path
+        self.lock_timeout = lock_timeout
+        self._connections = SQLiteConnections(path, timeout=lock_timeout)
+
+        with self._connections.get() as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS rate_limit_buckets ('
+                'key TEXT PRIMARY KEY, tokens REAL NOT NULL, updated_at REAL NOT NULL)'
+            )
+
+    def _reserve(self, key: str, rate: float, burst: float) -> float:
+        """Reserva un token del bucket `key` dentro de una transacción exclusiva"""
+        conn = self._connections.get()
+        conn.execute('BEGIN IMMEDIATE')
+
+        try:
+            # Reloj de pared: es el único que comparten todos los procesos
+            now = time.time()
+            row = conn.execute(
+                'SELECT tokens, updated_at FROM rate_limit_buckets WHERE key = ?',
+                (key,)
+            ).fetchone()
+
+            tokens, updated_at = row if row else (burst, now)
+            tokens = min(burst, tokens + max(0.0, now - updated_at) * rate) - 1
+
+            conn.execute(
+                'INSERT OR REPLACE INTO rate_limit_buckets (key, tokens, updated_at) VALUES (?, ?, ?)',
+                (key, tokens, now)
+            )
+            conn.execute('COMMIT')
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+
+        return -tokens / rate if tokens < 0 else 0.0
+
+    def _release(self, key: str) -> None:
+        self._connections.get().execute(
+            'UPDATE rate_limit_buckets SET tokens = tokens + 1 WHERE key = ?',
+            (key,)
+        )
+
+    async def acquire_async(self, endpoint: str = '') -> float:
+        """Igual que acquire(), con las transacciones de SQLite en el executor del loop"""
+        loop = asyncio.get_running_loop()
+        # BEGIN IMMEDIATE puede esperar el lock hasta lock_timeout: fuera del event loop
+        delays = await loop.run_in_executor(None, self._reserve_all, endpoint)
+        waited = max(delays.values())
+        if waited > 0:
+            await asyncio.sleep(waited)
+        self._record(delays)
+        return waited
@@ -0,0 +1,143 @@
+"""
+Política de reintentos para el cliente de Skydropx
+
+Backoff exponencial con full jitter (cada espera es aleatoria entre 0 y el
+tope exponencial), respeto del header Retry-After y un límite al tiempo
+total dedicado a reintentar. Por defecto solo se reintentan métodos
+idempotentes.
+
+Uso:
+    from retry import RetryPolicy
+
+    client = SkydropxClient(
+        ...,
+        retry_policy=RetryPolicy(max_retries=5, max_retry_time=30)
+    )
+"""
+
+import random
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Iterable, Optional
+
+
+class RetryPolicy:
+    """
+    Configuración de reintentos
+
+    Args:
+        max_retries: Reintentos máximos por petición (default: 3)
+        backoff_base: Segundos base del backoff exponencial (default: 0.5)
+        backoff_max: Tope de cada espera calculada (default: 30)
+        max_retry_time: Segundos máximos acumulados reintentando (default: 60)
+        retry_statuses: Códigos HTTP que se reintentan (default: 429, 502, 503, 504)
+        retry_methods: Métodos que se reintentan (default: idempotentes)
+        retry_on_connection_errors: Reintentar timeouts y errores de conexión (default: True)
+        respect_retry_after: Usar el header Retry-After cuando venga (default: True)
+    """
+
+    IDEMPOTENT_METHODS = frozenset({'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'})
+    RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+    def __init__(
+        self,
+        max_retries: int = 3,
+        backoff_base: float = 0.5,
+        backoff_max: float = 30.0,
+        max_retry_time: float = 60.0,
+        retry_statuses: Optional[Iterable[int]] = None,
+        retry_methods: Optional[Iterable[str]] = None,
+        retry_on_connection_errors: bool = True,
+        respect_retry_after: bool = True
+    ):
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_retry_time = max_retry_time
+        self.retry_statuses = frozenset(retry_statuses if retry_statuses is not None else self.RETRY_STATUSES)
+        self.retry_methods = frozenset(
+            m.upper() for m in (retry_methods if retry_methods is not None else self.IDEMPOTENT_METHODS)
+        )
+        self.retry_on_connection_errors = retry_on_connection_errors
+        self.respect_retry_after = respect_retry_after
+
+    @staticmethod
+    def parse_retry_after(value: Optional[str]) -> Optional[float]:
+        """
+        Interpreta el header Retry-After
+
+        Args:
+            value: Segundos ('120') o fecha HTTP ('Wed, 21 Oct 2015 07:28:00 GMT')
+
+        Returns:
+            Segundos a esperar, o None si no viene o no es válido
+        """
+        if not value:
+            return None
+
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+
+        try:
+            retry_at = parsedate_to_datetime(value)
+        except (TypeError, ValueError):
+            return None
+
+        if retry_at.tzinfo is None:
+            retry_at = retry_at.replace(tzinfo=timezone.utc)
+        return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+    def backoff(self, attempt: int) -> float:
+        """Espera con full jitter para el reintento número `attempt` (desde 0)"""
+        cap = min(self.backoff_max, self.backoff_base * (2 ** attempt))
+        return random.uniform(0, cap)
+
+    def next_delay(
+        self,
+        method: str,
+        attempt: int,
+        started_at: float,
+        status_code: Optional[int] = None,
+        retry_after: Optional[str] = None,
+        force: bool = False
+    ) -> Optional[float]:
+        """
+        Decide si se reintenta y cuánto esperar
+
+        Args:
+            method: Método HTTP
+            attempt: Reintentos ya realizados
+            started_at: time.monotonic() del primer intento
+            status_code: Código HTTP recibido (None si fue error de conexión)
+            retry_after: Valor del header Retry-After
+            force: Reintentar aunque el método no sea idempotente
+
+        Returns:
+            Segundos a esperar, o None si no debe reintentarse
+        """
+        if attempt >= self.max_retries:
+            return None
+
+        if not force and method.upper() not in self.retry_methods:
+            return None
+
+        if status_code is None:
+            if not self.retry_on_connection_errors:
+                return None
+        elif status_code not in self.retry_statuses:
+            return None
+
+        delay = self.backoff(attempt)
+
+        if self.respect_retry_after:
+            server_delay = self.parse_retry_after(retry_after)
+            if server_delay is not None:
+                delay = server_delay
+
+        if time.monotonic() - started_at + delay > self.max_retry_time:
+            return None
+
+        return delay
@@ -25,22 +25,113 @@ Uso básico:
 """
 
 import requests
+from requests.adapters import HTTPAdapter
 import time
+import copy
 import json
-from typing import Dict, List, Optional, Any
+import logging
+import heapq
+import itertools
+import re
+import threading
+import uuid
+from contextlib import contextmanager
+from functools import lru_cache
+from urllib.parse import urlencode
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from typing import Callable, Dict, Iterable, Iterator, List, Mapping, Optional, Tuple, Union, Any
 from datetime import datetime, timedelta
 
+try:
+    from .rate_limit import RateLimiter, RateLimitTimeout
+    from .token_store import TokenStore
+    from .retry import RetryPolicy
+    from .idempotency import IdempotencyJournal
+    from .cache import QuoteCache, ResponseCache, CachedResponse
+    from .tracking import BulkTrackingResult, unique_trackings
+    from .transport import (
+        Transport, TransportResponse, RequestsTransport, TransportError, TransportTimeout, TransportConnectionError
+    )
+    from .webhooks import WebhookVerifier
+except ImportError:  # Importado como módulo suelto (ver examples/)
+    from rate_limit import RateLimiter, RateLimitTimeout
+    from token_store import TokenStore
+    from retry import RetryPolicy
+    from idempotency import IdempotencyJournal
+    from cache import QuoteCache, ResponseCache, CachedResponse
+    from tracking import BulkTrackingResult, unique_trackings
+    from transport import (
+        Transport, TransportResponse, RequestsTransport, TransportError, TransportTimeout, TransportConnectionError
+    )
+    from webhooks import WebhookVerifier
+
+
+logger = logging.getLogger(__name__)
+
+# Segmentos de ruta con dígitos (IDs), excepto la versión de la API (v1)
+_ID_SEGMENT = re.compile(r'/(?!v\d+(?:/|$))[^/]*\d[^/]*')
+
+
+def endpoint_template(endpoint: str) -> str:
+    """
+    Normaliza un endpoint reemplazando IDs por {id}, para agrupar estadísticas
+    
+    Ejemplo: '/api/v1/shipments/93774c22-.../cancel' -> '/api/v1/shipments/{id}/cancel'
+    """
+    return _ID_SEGMENT.sub('/{id}', endpoint)
+
+
+def poll_intervals(initial: float = 0.25, factor: float = 1.6, max_interval: float = 4.0) -> Iterator[float]:
+    """
+    Intervalos de polling adaptativos: rápidos al inicio y luego con backoff
+    
+    Con los valores por defecto: 0.25, 0.4, 0.64, 1.02, 1.64, 2.62, 4, 4, ...
+    """
+    interval = initial
+    while True:
+        yield interval
+        interval = min(max_interval, interval * factor)
+
 
 class SkydropxError(Exception):
     """Excepción base para errores de Skydropx"""
     
-    def __init__(self, message: str, status_code: Optional[int] = None, response_data: Optional[Dict] = None):
+    def __init__(
+        self,
+        message: str,
+        status_code: Optional[int] = None,
+        response_data: Optional[Dict] = None,
+        headers: Optional[Mapping[str, str]] = None
+    ):
         self.message = message
         self.status_code = status_code
         self.response_data = response_data
+        # Headers de la respuesta (ej. Retry-After en un 429/503)
+        self.headers = headers
         super().__init__(self.message)
 
 
+class _Flight:
+    """Petición GET en vuelo compartida por varios llamadores"""
+    
+    __slots__ = ('done', 'result', 'error', 'finished_at', 'deadline')
+    
+    def __init__(self, deadline: Optional[float] = None):
+        self.done = threading.Event()
+        self.result: Optional[Dict] = None
+        self.error: Optional[BaseException] = None
+        self.finished_at: Optional[float] = None
+        # Plazo del llamador que hace la petición (sus errores pueden deberse a él)
+        self.deadline = deadline
+    
+    def finish(self) -> None:
+        self.finished_at = time.monotonic()
+        self.done.set()
+    
+    def expired(self, now: float, ttl: float) -> bool:
+        return self.finished_at is not None and now - self.finished_at >= ttl
+
+
 class SkydropxClient:
     """
     Cliente para la API de Skydropx
@@ -50,6 +141,29 @@ class SkydropxClient:
         client_secret: Client Secret de OAuth
         environment: 'sandbox' o 'production'
         auto_renew_token: Si debe renovar automáticamente el token (default: True)
+        rate_limit: Solicitudes por segundo permitidas (default: 2.0, None para desactivar)
+        rate_limiter: Limitador propio (ej. con buckets por endpoint); ignora rate_limit
+        background_token_refresh: Renovar el token en un hilo de fondo antes de que expire (default: False)
+        token_refresh_ahead: Segundos antes de expirar en que renueva el hilo de fondo (default: 600)
+        token_store: Almacén donde compartir el token entre procesos y reinicios (opcional)
+        retry_policy: Política de reintentos (default: RetryPolicy(); None para desactivar)
+        idempotency_journal: Bitácora de creaciones en vuelo para create_shipment/create_pickup (opcional)
+        quote_cache: Caché de cotizaciones por ruta para quote() y quote_many() (opcional)
+        response_cache: Caché HTTP condicional (ETag / Last-Modified) para los GET (opcional)
+        coalesce_requests: Compartir una sola petición entre GET idénticos concurrentes (default: False)
+        coalesce_ttl: Segundos que se reutiliza el resultado de un GET compartido tras completarse (default: 0)
+        pool_connections: Hosts distintos con pool propio (default: 10)
+        pool_maxsize: Conexiones guardadas por host; úsalo >= hilos que comparten el cliente (default: 10)
+        pool_block: Esperar una conexión libre en lugar de abrir una extra que se descarta (default: False)
+        keep_alive: Reutilizar conexiones entre peticiones (default: True)
+        keepalive_interval: Segundos de inactividad tras los que un hilo de fondo vuelve a calentar el pool (opcional)
+        transport: Transporte HTTP (default: RequestsTransport sobre self.session; las opciones
+            de pool solo aplican a ese default)
+        connect_timeout: Segundos máximos para conectar (default: 10)
+        read_timeout: Segundos máximos esperando la respuesta (default: 30)
+        method_timeouts: Dict método -> (connect, read) que reemplaza los defaults (se combina con
+            METHOD_TIMEOUTS, que solo aplica si no se pasó connect_timeout ni read_timeout)
+        request_deadline: Segundos máximos por petición sumando rate limiting, intentos y reintentos (opcional)
     """
     
     BASE_URLS = {
@@ -57,27 +171,125 @@ class SkydropxClient:
         'production': 'https://app.skydropx.com'
     }
     
+    ERROR_MESSAGES = {
+        400: 'Solicitud inválida',
+        401: 'No autorizado - Verifica tus credenciales',
+        403: 'Acceso prohibido',
+        404: 'Recurso no encontrado',
+        422: 'Error de validación',
+        429: 'Límite de tasa excedido - Intenta más tarde',
+        500: 'Error interno del servidor',
+        503: 'Servicio no disponible'
+    }
+    
+    # Páginas que revisa la búsqueda de un create_* posiblemente duplicado
+    IDEMPOTENCY_LOOKUP_PAGES = 5
+    
+    # (connect, read) por método; crear guías o recolecciones puede tardar más que una consulta
+    METHOD_TIMEOUTS = {
+        'POST': (10.0, 60.0)
+    }
+    
     def __init__(
         self,
         client_id: str,
         client_secret: str,
         environment: str = 'sandbox',
-        auto_renew_token: bool = True
+        auto_renew_token: bool = True,
+        rate_limit: Optional[float] = 2.0,
+        rate_limiter: Optional[RateLimiter] = None,
+        background_token_refresh: bool = False,
+        token_refresh_ahead: int = 600,
+        token_store: Optional[TokenStore] = None,
+        retry_policy: Optional[RetryPolicy] = RetryPolicy(),
+        idempotency_journal: Optional[IdempotencyJournal] = None,
+        quote_cache: Optional[QuoteCache] = None,
+        response_cache: Optional[ResponseCache] = None,
+        coalesce_requests: bool = False,
+        coalesce_ttl: float = 0.0,
+        pool_connections: int = 10,
+        pool_maxsize: int = 10,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        keepalive_interval: Optional[float] = None,
+        transport: Optional[Transport] = None,
+        connect_timeout: Optional[float] = None,
+        read_timeout: Optional[float] = None,
+        method_timeouts: Optional[Dict[str, Tuple[float, float]]] = None,
+        request_deadline: Optional[float] = None
     ):
         self.client_id = client_id
         self.client_secret = client_secret
         self.environment = environment
         self.auto_renew_token = auto_renew_token
         
+        if rate_limiter is None and rate_limit:
+            rate_limiter = RateLimiter(rate=rate_limit)
+        self.rate_limiter = rate_limiter
+        self._local = threading.local()
+        
+        self.retry_policy = retry_policy
+        self._retry_counts: Dict[str, int] = {}
+        self._retry_lock = threading.Lock()
+        self.idempotency_journal = idempotency_journal
+        self.quote_cache = quote_cache
+        self.response_cache = response_cache
+        
+        self.coalesce_requests = coalesce_requests
+        self.coalesce_ttl = coalesce_ttl
+        self._flights: Dict[str, _Flight] = {}
+        self._flights_lock = threading.Lock()
+        self._coalesce_stats = {'upstream': 0, 'shared': 0}
+        
         self.base_url = self.BASE_URLS.get(environment, self.BASE_URLS['sandbox'])
         self.access_token: Optional[str] = None
         self.token_expires_at: Optional[datetime] = None
+        self.token_refresh_ahead = token_refresh_ahead
+        self.token_store = token_store
+        self._token_store_key = f'{environment}:{client_id}'
+        
+        self._token_lock = threading.RLock()
+        self._refresher_thread: Optional[threading.Thread] = None
+        self._refresher_stop = threading.Event()
         
         self.session = requests.Session()
         self.session.headers.update({
             'Content-Type': 'application/json',
             'User-Agent': 'Skydropx-Python-SDK/1.0.0'
         })
+        if not keep_alive:
+            self.session.headers['Connection'] = 'close'
+        
+        # Un pool por host con pool_maxsize conexiones; los reintentos son de retry_policy
+        self.pool_maxsize = pool_maxsize
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            max_retries=0
+        )
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self.transport = transport if transport is not None else RequestsTransport(self.session)
+        
+        # Con timeouts explícitos los defaults por método no los pisan
+        explicit_timeouts = connect_timeout is not None or read_timeout is not None
+        self.connect_timeout = connect_timeout if connect_timeout is not None else 10.0
+        self.read_timeout = read_timeout if read_timeout is not None else 30.0
+        self.method_timeouts = {} if explicit_timeouts else dict(self.METHOD_TIMEOUTS)
+        self.method_timeouts.update({m.upper(): t for m, t in (method_timeouts or {}).items()})
+        self.request_deadline = request_deadline
+        
+        self._last_activity = time.monotonic()
+        self._warm_connections = 1
+        self._pinger_thread: Optional[threading.Thread] = None
+        self._pinger_stop = threading.Event()
+        
+        if background_token_refresh:
+            self.start_token_refresher()
+        
+        if keepalive_interval:
+            self.start_keepalive_pinger(keepalive_interval)
     
     def _should_renew_token(self) -> bool:
         """Verifica si el token debe renovarse"""
@@ -87,30 +299,314 @@ class SkydropxClient:
         # Renovar 5 minutos antes de expirar
         return datetime.now() >= (self.token_expires_at - timedelta(minutes=5))
     
-    def _handle_error(self, response: requests.Response) -> None:
+    def _ensure_token(self) -> None:
+        """
+        Renueva el token de forma single-flight
+        
+        Solo el primer hilo que toma el lock llama a /oauth/token; los demás
+        esperan y, al entrar, encuentran el token ya renovado.
+        """
+        with self._token_lock:
+            if self._should_renew_token():
+                self._renew_token(valid_until=datetime.now() + timedelta(minutes=5))
+    
+    def _renew_token(self, valid_until: datetime) -> None:
+        """
+        Obtiene un token vigente al menos hasta `valid_until`
+        
+        Con token_store, primero intenta reutilizar el token que otro proceso
+        ya guardó; el lock del almacén evita que varios procesos se
+        autentiquen a la vez.
+        """
+        if self.token_store is None:
+            self.authenticate()
+            return
+        
+        with self.token_store.lock(self._token_store_key):
+            stored = self.token_store.load(self._token_store_key)
+            
+            if stored:
+                access_token, expires_at = stored
+                if datetime.fromtimestamp(expires_at) > valid_until:
+                    self.access_token = access_token
+                    self.token_expires_at = datetime.fromtimestamp(expires_at)
+                    return
+            
+            self.authenticate()
+    
+    def _token_refresher_loop(self) -> None:
+        """Renueva el token `token_refresh_ahead` segundos antes de que expire"""
+        retry_delay = 5.0
+        
+        while not self._refresher_stop.is_set():
+            expires_at = self.token_expires_at
+            
+            if expires_at is None:
+                delay = 0.0
+            else:
+                refresh_at = expires_at - timedelta(seconds=self.token_refresh_ahead)
+                # Mínimo 1s por si expires_in es menor que token_refresh_ahead
+                delay = max(1.0, (refresh_at - datetime.now()).total_seconds())
+            
+            if self._refresher_stop.wait(delay):
+                break
+            
+            try:
+                with self._token_lock:
+                    # Otro hilo pudo renovarlo mientras esperábamos
+                    if self.token_expires_at is expires_at:
+                        self._renew_token(
+                            valid_until=datetime.now() + timedelta(seconds=self.token_refresh_ahead)
+                        )
+                retry_delay = 5.0
+            except SkydropxError as e:
+                logger.warning('No se pudo renovar el token en segundo plano: %s', e.message)
+                if self._refresher_stop.wait(retry_delay):
+                    break
+                retry_delay = min(retry_delay * 2, 300.0)
+    
+    def start_token_refresher(self) -> None:
+        """
+        Inicia un hilo de fondo que renueva el token antes de la ventana de 5 minutos
+        
+        Así ninguna petición paga el round trip de autenticación.
+        """
+        if self._refresher_thread and self._refresher_thread.is_alive():
+            return
+        
+        self._refresher_stop.clear()
+        self._refresher_thread = threading.Thread(
+            target=self._token_refresher_loop,
+            name='skydropx-token-refresher',
+            daemon=True
+        )
+        self._refresher_thread.start()
+    
+    def stop_token_refresher(self) -> None:
+        """Detiene el hilo de renovación de fondo"""
+        self._refresher_stop.set()
+        if self._refresher_thread and self._refresher_thread is not threading.current_thread():
+            self._refresher_thread.join()
+        self._refresher_thread = None
+    
+    def warmup(self, connections: Optional[int] = None, timeout: float = 10.0) -> int:
+        """
+        Abre conexiones al API antes de que llegue el tráfico
+        
+        Hace `connections` peticiones HEAD simultáneas a la URL base, de modo
+        que DNS, TCP y TLS se pagan ahora y las conexiones quedan en el pool.
+        
+        Args:
+            connections: Conexiones a abrir (default: pool_maxsize)
+            timeout: Segundos máximos por conexión (default: 10)
+            
+        Returns:
+            Número de conexiones abiertas
+        """
+        count = max(1, min(connections or self.pool_maxsize, self.pool_maxsize))
+        self._warm_connections = count
+        barrier = threading.Barrier(count)
+        
+        def open_connection() -> bool:
+            try:
+                # Todas salen a la vez para que cada una ocupe su propia conexión
+                barrier.wait(timeout)
+            except threading.BrokenBarrierError:
+                pass
+            try:
+                self.transport.request('HEAD', self.base_url, timeout=timeout)
+                return True
+            except TransportError as e:
+                logger.debug("warmup: no se pudo abrir conexión: %s", e)
+                return False
+        
+        with ThreadPoolExecutor(max_workers=count, thread_name_prefix='skydropx-warmup') as executor:
+            opened = sum(executor.map(lambda _: open_connection(), range(count)))
+        
+        self._last_activity = time.monotonic()
+        return opened
+    
+    def _keepalive_loop(self, interval: float) -> None:
+        """Recalienta el pool cuando lleva `interval` segundos sin tráfico"""
+        while not self._pinger_stop.wait(max(1.0, interval - (time.monotonic() - self._last_activity))):
+            if time.monotonic() - self._last_activity >= interval:
+                self.warmup(self._warm_connections)
+    
+    def start_keepalive_pinger(self, interval: float = 30.0) -> None:
+        """
+        Inicia un hilo de fondo que mantiene vivas las conexiones del pool
+        
+        Si el cliente pasa `interval` segundos sin peticiones, repite warmup()
+        con el mismo número de conexiones, antes de que el servidor o un
+        balanceador cierre las conexiones inactivas.
+        
+        Args:
+            interval: Segundos de inactividad antes de cada ping (default: 30)
+        """
+        if self._pinger_thread and self._pinger_thread.is_alive():
+            return
+        
+        self._pinger_stop.clear()
+        self._pinger_thread = threading.Thread(
+            target=self._keepalive_loop,
+            args=(interval,),
+            name='skydropx-keepalive',
+            daemon=True
+        )
+        self._pinger_thread.start()
+    
+    def stop_keepalive_pinger(self) -> None:
+        """Detiene el hilo de keep-alive"""
+        self._pinger_stop.set()
+        if self._pinger_thread and self._pinger_thread is not threading.current_thread():
+            self._pinger_thread.join()
+        self._pinger_thread = None
+    
+    def close(self) -> None:
+        """Detiene los hilos de fondo y cierra la sesión HTTP"""
+        self.stop_token_refresher()
+        self.stop_keepalive_pinger()
+        self.transport.close()
+        self.session.close()
+    
+    def __enter__(self) -> 'SkydropxClient':
+        return self
+    
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+    
+    @contextmanager
+    def deadline(self, seconds: float) -> Iterator[None]:
+        """
+        Límite de tiempo total para las llamadas hechas dentro del bloque
+        
+        Cubre esperas del rate limiter, intentos, reintentos y el polling de
+        cotizaciones; al agotarse, la llamada en curso lanza SkydropxError
+        sin esperar más. Los bloques anidados solo pueden acortar el plazo.
+        Aplica al hilo que entra al bloque y al trabajo que el cliente reparte
+        en sus propios hilos (track_bulk, quote_many, paginación paralela).
+        
+        Args:
+            seconds: Segundos disponibles desde ahora
+        
+        Uso:
+            with client.deadline(2.0):
+                tracking = client.track_shipment(number, 'fedex')
+        """
+        with self._deadline_at(time.monotonic() + seconds):
+            yield
+    
+    @contextmanager
+    def _deadline_at(self, deadline: Optional[float]) -> Iterator[None]:
+        """Como deadline(), con el plazo absoluto (time.monotonic()); None no cambia nada"""
+        previous = getattr(self._local, 'deadline', None)
+        if deadline is not None:
+            self._local.deadline = deadline if previous is None else min(previous, deadline)
+        try:
+            yield
+        finally:
+            self._local.deadline = previous
+    
+    def _bind_deadline(self, fn: Callable) -> Callable:
+        """Envuelve `fn` para que corra en otro hilo con el plazo del hilo actual"""
+        deadline = getattr(self._local, 'deadline', None)
+        if deadline is None:
+            return fn
+        
+        def bound(*args, **kwargs):
+            with self._deadline_at(deadline):
+                return fn(*args, **kwargs)
+        
+        return bound
+    
+    def _current_deadline(self, started_at: Optional[float] = None) -> Optional[float]:
+        """Plazo vigente (time.monotonic()) del hilo, combinado con request_deadline"""
+        deadline = getattr(self._local, 'deadline', None)
+        if started_at is not None and self.request_deadline is not None:
+            request_deadline = started_at + self.request_deadline
+            deadline = request_deadline if deadline is None else min(deadline, request_deadline)
+        return deadline
+    
+    def _timeout_for(self, method: str, deadline: Optional[float]) -> Tuple[float, float]:
+        """(connect, read) del método, recortados a lo que queda del plazo"""
+        connect_timeout, read_timeout = self.method_timeouts.get(method, (self.connect_timeout, self.read_timeout))
+        
+        if deadline is not None:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise SkydropxError('Plazo excedido - La operación superó su deadline')
+            connect_timeout = min(connect_timeout, remaining)
+            read_timeout = min(read_timeout, remaining)
+        
+        return connect_timeout, read_timeout
+    
+    @property
+    def last_rate_limit_wait(self) -> float:
+        """Segundos que la última petición de este hilo esperó en el limitador"""
+        return getattr(self._local, 'rate_limit_wait', 0.0)
+    
+    def _wait_for_rate_limit(self, endpoint: str, deadline: Optional[float] = None) -> None:
+        """Espera localmente hasta que el limitador permita la petición, sin pasar de `deadline`"""
+        if self.rate_limiter is None:
+            return
+        
+        max_wait = max(0.0, deadline - time.monotonic()) if deadline is not None else None
+        try:
+            waited = self.rate_limiter.acquire(endpoint, max_wait=max_wait)
+        except RateLimitTimeout as e:
+            raise SkydropxError(
+                f'Plazo excedido - El rate limit requiere esperar {e.wait:.2f}s y no queda tiempo'
+            )
+        self._local.rate_limit_wait = waited
+        
+        if waited > 0:
+            logger.debug('Rate limit: %s esperó %.3fs en cola', endpoint, waited)
+    
+    def _next_retry_delay(
+        self,
+        method: str,
+        attempt: int,
+        started_at: float,
+        response: Optional[TransportResponse] = None,
+        deadline: Optional[float] = None
+    ) -> Optional[float]:
+        """Segundos a esperar antes de reintentar, o None si no se reintenta (o no cabe en `deadline`)"""
+        if self.retry_policy is None:
+            return None
+        
+        delay = self.retry_policy.next_delay(
+            method,
+            attempt,
+            started_at,
+            status_code=response.status_code if response is not None else None,
+            retry_after=response.headers.get('Retry-After') if response is not None else None
+        )
+        
+        if delay is not None and deadline is not None and time.monotonic() + delay >= deadline:
+            return None
+        
+        return delay
+    
+    def _record_retry(self, method: str, endpoint: str) -> None:
+        """Cuenta un reintento para el endpoint (con IDs normalizados)"""
+        key = f'{method} {endpoint_template(endpoint)}'
+        with self._retry_lock:
+            self._retry_counts[key] = self._retry_counts.get(key, 0) + 1
+    
+    def _handle_error(self, response: TransportResponse) -> None:
         """Maneja errores de la API"""
         try:
             error_data = response.json()
         except:
             error_data = {'error': response.text}
         
-        error_messages = {
-            400: 'Solicitud inválida',
-            401: 'No autorizado - Verifica tus credenciales',
-            403: 'Acceso prohibido',
-            404: 'Recurso no encontrado',
-            422: 'Error de validación',
-            429: 'Límite de tasa excedido - Intenta más tarde',
-            500: 'Error interno del servidor',
-            503: 'Servicio no disponible'
-        }
-        
-        message = error_messages.get(response.status_code, f'Error {response.status_code}')
+        message = self.ERROR_MESSAGES.get(response.status_code, f'Error {response.status_code}')
         
         raise SkydropxError(
             message=message,
             status_code=response.status_code,
-            response_data=error_data
+            response_data=error_data,
+            headers=response.headers
         )
     
     def _request(
@@ -119,45 +615,465 @@ class SkydropxClient:
         endpoint: str,
         data: Optional[Dict] = None,
         params: Optional[Dict] = None,
-        requires_auth: bool = True
+        requires_auth: bool = True,
+        idempotency_key: Optional[str] = None
     ) -> Dict:
         """Realiza una petición a la API"""
+        method = method.upper()
+        
+        if method == 'GET' and self.coalesce_requests:
+            return self._coalesced_get(endpoint, params, requires_auth)
+        
+        return self._send_request(method, endpoint, data, params, requires_auth, idempotency_key)
+    
+    def _coalesced_get(self, endpoint: str, params: Optional[Dict], requires_auth: bool) -> Dict:
+        """
+        GET single-flight: los GET idénticos concurrentes esperan la petición
+        en vuelo y reciben una copia de su resultado (o de su error). Con
+        coalesce_ttl > 0 el resultado se sigue compartiendo ese tiempo tras
+        completarse. Cada llamador espera solo hasta su propio deadline, y un
+        error de una petición con un plazo más corto que el suyo no se le
+        pasa: hace su propia petición.
+        """
+        key = self._request_key(endpoint, params)
+        now = time.monotonic()
+        deadline = self._current_deadline()
+        
+        with self._flights_lock:
+            flight = self._flights.get(key)
+            if flight is not None and flight.expired(now, self.coalesce_ttl):
+                flight = None
+            
+            leader = flight is None
+            if leader:
+                if len(self._flights) >= 1024:
+                    self._flights = {k: f for k, f in self._flights.items() if not f.expired(now, self.coalesce_ttl)}
+                flight = _Flight(deadline)
+                self._flights[key] = flight
+                self._coalesce_stats['upstream'] += 1
+            else:
+                self._coalesce_stats['shared'] += 1
+        
+        if leader:
+            try:
+                flight.result = self._send_request('GET', endpoint, params=params, requires_auth=requires_auth)
+            except BaseException as e:
+                flight.error = e
+            finally:
+                flight.finish()
+                if flight.error is not None or self.coalesce_ttl <= 0:
+                    with self._flights_lock:
+                        if self._flights.get(key) is flight:
+                            del self._flights[key]
+        else:
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not flight.done.wait(remaining):
+                raise SkydropxError('Plazo excedido - La petición compartida no terminó a tiempo')
+        
+        if flight.error is not None:
+            if not leader and flight.deadline is not None and (deadline is None or deadline > flight.deadline):
+                # El error pudo venir del plazo de otro llamador, no del nuestro
+                return self._send_request('GET', endpoint, params=params, requires_auth=requires_auth)
+            raise flight.error
+        # Copia por llamador: ninguno ve las modificaciones de otro
+        return copy.deepcopy(flight.result)
+    
+    def _send_request(
+        self,
+        method: str,
+        endpoint: str,
+        data: Optional[Dict] = None,
+        params: Optional[Dict] = None,
+        requires_auth: bool = True,
+        idempotency_key: Optional[str] = None
+    ) -> Dict:
+        """Envía la petición con caché HTTP, rate limiting y reintentos"""
+        # Caché HTTP: respuesta vigente sin consultar, o validadores para un GET condicional
+        cache_key = None
+        cached = None
+        if method == 'GET' and self.response_cache is not None:
+            cache_key = self._request_key(endpoint, params)
+            cached = self.response_cache.get(cache_key)
+            if cached is not None and self.response_cache.is_fresh(endpoint, cached):
+                self.response_cache.record('hit')
+                return json.loads(cached.body) if cached.body else {}
         
         # Renovar token si es necesario
         if requires_auth and self.auto_renew_token and self._should_renew_token():
-            self.authenticate()
+            self._ensure_token()
         
         # Configurar headers
         headers = {}
         if requires_auth and self.access_token:
             headers['Authorization'] = f'Bearer {self.access_token}'
+        if idempotency_key:
+            headers['Idempotency-Key'] = idempotency_key
+        if cache_key is not None:
+            headers.update(self.response_cache.conditional_headers(cached))
         
-        # Realizar petición
+        # Realizar petición (con reintentos según retry_policy)
         url = f"{self.base_url}{endpoint}"
+        started_at = time.monotonic()
+        deadline = self._current_deadline(started_at)
+        attempt = 0
         
-        try:
-            response = self.session.request(
-                method=method,
-                url=url,
-                json=data,
-                params=params,
-                headers=headers,
-                timeout=30
-            )
+        while True:
+            self._wait_for_rate_limit(endpoint, deadline)
+            
+            try:
+                response = self.transport.request(
+                    method,
+                    url,
+                    params=params,
+                    json_body=data,
+                    headers=headers,
+                    timeout=self._timeout_for(method, deadline)
+                )
+                self._last_activity = time.monotonic()
+                
+                if not response.ok:
+                    delay = self._next_retry_delay(method, attempt, started_at, response, deadline)
+                    if delay is None:
+                        self._handle_error(response)
+                else:
+                    return self._parse_response(method, endpoint, response, cache_key, cached)
+                
+            except TransportTimeout:
+                delay = self._next_retry_delay(method, attempt, started_at, deadline=deadline)
+                if delay is None:
+                    raise SkydropxError('Timeout - La solicitud tardó demasiado')
+            except TransportConnectionError:
+                delay = self._next_retry_delay(method, attempt, started_at, deadline=deadline)
+                if delay is None:
+                    raise SkydropxError('Error de conexión - Verifica tu internet')
+            except SkydropxError:
+                raise
+            except Exception as e:
+                raise SkydropxError(f'Error inesperado: {str(e)}')
+            
+            attempt += 1
+            self._record_retry(method, endpoint)
+            logger.info('Reintento %d de %s %s en %.2fs', attempt, method, endpoint, delay)
+            time.sleep(delay)
+    
+    def _request_key(self, endpoint: str, params: Optional[Dict]) -> str:
+        """Llave de un GET (caché HTTP y coalescing): cuenta, entorno, endpoint y query ordenada"""
+        query = urlencode(sorted((k, v) for k, v in (params or {}).items() if v is not None), doseq=True)
+        return f'{self.environment}:{self.client_id} {endpoint}?{query}'
+    
+    def _parse_response(
+        self,
+        method: str,
+        endpoint: str,
+        response: TransportResponse,
+        cache_key: Optional[str],
+        cached: Optional[CachedResponse]
+    ) -> Dict:
+        """Convierte una respuesta exitosa en dict y actualiza la caché HTTP"""
+        cache = self.response_cache
+        
+        if cache is not None:
+            if response.status_code == 304 and cached is not None:
+                cache.record('revalidated')
+                return json.loads(cached.body) if cached.body else {}
+            
+            if cache_key is not None:
+                cache.record('miss')
+                if response.status_code == 200:
+                    cache.store(
+                        cache_key,
+                        response.content,
+                        response.headers.get('ETag'),
+                        response.headers.get('Last-Modified')
+                    )
+            elif method != 'GET':
+                cache.invalidate(endpoint)
+        
+        return response.json() if response.content else {}
+    
+    def _idempotent_create(
+        self,
+        kind: str,
+        endpoint: str,
+        payload: Dict,
+        idempotency_key: Optional[str],
+        find_existing: Callable[[Dict, float], Optional[str]],
+        fetch: Callable[[str], Dict]
+    ) -> Dict:
+        """
+        POST de creación protegido contra duplicados
+        
+        Envía el header Idempotency-Key y, si hay bitácora, registra la
+        creación como pendiente antes del POST. Ante un timeout, error de
+        conexión o 5xx reintenta según retry_policy solo si el llamador lo
+        pidió (pasó `idempotency_key` o configuró la bitácora); si no, el POST
+        se reintenta únicamente cuando 'POST' está en retry_methods. Antes de
+        cada nuevo POST busca con `find_existing` si el primero sí llegó a
+        crearse. Si la llave ya estaba completada en la bitácora, devuelve el
+        recurso existente sin hacer POST.
+        
+        Args:
+            kind: 'shipment' o 'pickup'
+            endpoint: Endpoint de creación
+            payload: Body del POST
+            idempotency_key: Llave de idempotencia (se genera una si es None)
+            find_existing: Busca el recurso creado; recibe (payload, created_at)
+            fetch: Obtiene el recurso por ID
+        """
+        key = idempotency_key or str(uuid.uuid4())
+        journal = self.idempotency_journal
+        # Con una llave propia o bitácora el reintento es seguro aunque POST no sea idempotente
+        force_retry = idempotency_key is not None or journal is not None
+        created_at = time.time()
+        
+        if journal is not None:
+            entry = journal.get(key)
             
-            if not response.ok:
-                self._handle_error(response)
+            if entry and entry['state'] == IdempotencyJournal.COMPLETED and entry['resource_id']:
+                return fetch(entry['resource_id'])
             
-            return response.json() if response.content else {}
+            if entry:
+                # Un intento anterior quedó en vuelo: buscarlo antes de duplicar
+                resource_id = find_existing(payload, entry['created_at'])
+                if resource_id:
+                    journal.complete(key, resource_id)
+                    return fetch(resource_id)
             
-        except requests.exceptions.Timeout:
-            raise SkydropxError('Timeout - La solicitud tardó demasiado')
-        except requests.exceptions.ConnectionError:
-            raise SkydropxError('Error de conexión - Verifica tu internet')
-        except SkydropxError:
-            raise
-        except Exception as e:
-            raise SkydropxError(f'Error inesperado: {str(e)}')
+            created_at = journal.begin(key, kind)['created_at']
+        
+        started_at = time.monotonic()
+        attempt = 0
+        
+        while True:
+            try:
+                response = self._request('POST', endpoint, data=payload, idempotency_key=key)
+                break
+            except SkydropxError as e:
+                retryable = e.status_code is None or e.status_code == 429 or e.status_code >= 500
+                delay = None
+                
+                if retryable and self.retry_policy is not None:
+                    delay = self.retry_policy.next_delay(
+                        'POST',
+                        attempt,
+                        started_at,
+                        status_code=e.status_code,
+                        retry_after=e.headers.get('Retry-After') if e.headers else None,
+                        force=force_retry
+                    )
+                
+                # Sin tiempo para esperar y reintentar dentro del plazo: fallar ya
+                call_deadline = self._current_deadline(started_at)
+                if delay is not None and call_deadline is not None and time.monotonic() + delay >= call_deadline:
+                    delay = None
+                
+                if delay is None:
+                    # Un 4xx es un rechazo definitivo: el recurso no existe
+                    if journal is not None and not retryable:
+                        journal.discard(key)
+                    raise
+            
+            attempt += 1
+            self._record_retry('POST', endpoint)
+            time.sleep(delay)
+            
+            resource_id = find_existing(payload, created_at)
+            if resource_id:
+                response = fetch(resource_id)
+                break
+        
+        if journal is not None:
+            journal.complete(key, response.get('data', {}).get('id'))
+        
+        return response
+    
+    def _iter_pages(
+        self,
+        fetch_page: Callable[[Dict], Dict],
+        filters: Optional[Dict],
+        per_page: int,
+        prefetch: bool
+    ) -> Iterator[Dict]:
+        """
+        Recorre un listado paginado registro por registro
+        
+        Mientras se consumen los registros de una página, la siguiente ya se
+        está descargando en un hilo de fondo (si prefetch=True). Solo hay dos
+        páginas en memoria a la vez.
+        """
+        params = dict(filters or {})
+        params['per_page'] = per_page
+        page = int(params.pop('page', 1))
+        
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='skydropx-prefetch') if prefetch else None
+        
+        def fetch(number: int) -> Dict:
+            return fetch_page(dict(params, page=number))
+        
+        # La página adelantada corre en otro hilo: lleva el plazo del que la pide
+        fetch_ahead = self._bind_deadline(fetch)
+        
+        try:
+            result = fetch(page)
+            
+            while True:
+                records = result.get('data') or []
+                total_pages = result.get('meta', {}).get('total_pages', page)
+                has_next = bool(records) and page < total_pages
+                
+                next_page = None
+                if has_next and executor is not None:
+                    next_page = executor.submit(fetch_ahead, page + 1)
+                
+                for record in records:
+                    yield record
+                
+                if not has_next:
+                    return
+                
+                page += 1
+                result = next_page.result() if next_page is not None else fetch(page)
+        finally:
+            if executor is not None:
+                executor.shutdown(wait=False)
+    
+    def _iter_pages_parallel(
+        self,
+        fetch_page: Callable[[Dict], Dict],
+        filters: Optional[Dict],
+        per_page: int,
+        concurrency: int,
+        ordered: bool
+    ) -> Iterator[Dict]:
+        """
+        Recorre un listado descargando hasta `concurrency` páginas en paralelo
+        
+        La primera página da total_pages; el resto se pide en una ventana
+        deslizante (el limitador de tasa sigue aplicando a cada petición).
+        Si el listado cambia durante el recorrido:
+        
+        - Registros repetidos entre páginas (inserciones): se omiten por ID.
+        - total_pages crece: también se descargan las páginas nuevas.
+        - total_count disminuye (borrados): algunos registros pudieron
+          recorrerse a páginas ya leídas, así que se hace una pasada final
+          secuencial que solo entrega los IDs que faltaban.
+        """
+        params = dict(filters or {})
+        params['per_page'] = per_page
+        first_page = int(params.pop('page', 1))
+        seen = set()
+        
+        def fetch(number: int) -> Dict:
+            return fetch_page(dict(params, page=number))
+        
+        def unseen(result: Dict) -> Iterator[Dict]:
+            for record in result.get('data') or []:
+                record_id = record.get('id')
+                if record_id is not None:
+                    if record_id in seen:
+                        continue
+                    seen.add(record_id)
+                yield record
+        
+        result = fetch(first_page)
+        fetch_in_pool = self._bind_deadline(fetch)
+        meta = result.get('meta', {})
+        total_pages = meta.get('total_pages', first_page)
+        total_count = meta.get('total_count')
+        shrank = False
+        
+        for record in unseen(result):
+            yield record
+        
+        executor = ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='skydropx-pages')
+        running: Dict[Any, int] = {}
+        buffered: Dict[int, Dict] = {}
+        next_page = first_page + 1
+        expected = first_page + 1
+        
+        try:
+            while True:
+                # Ventana acotada: páginas en vuelo más páginas esperando turno
+                while next_page <= total_pages and len(running) + len(buffered) < concurrency:
+                    running[executor.submit(fetch_in_pool, next_page)] = next_page
+                    next_page += 1
+                
+                if not running:
+                    break
+                
+                done, _ = wait(list(running), return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    page = running.pop(future)
+                    result = future.result()
+                    meta = result.get('meta', {})
+                    
+                    total_pages = max(total_pages, meta.get('total_pages', total_pages))
+                    if total_count is not None and meta.get('total_count', total_count) < total_count:
+                        shrank = True
+                    
+                    if ordered:
+                        buffered[page] = result
+                    else:
+                        for record in unseen(result):
+                            yield record
+                
+                while expected in buffered:
+                    for record in unseen(buffered.pop(expected)):
+                        yield record
+                    expected += 1
+        finally:
+            for future in running:
+                future.cancel()
+            executor.shutdown(wait=False)
+        
+        if shrank:
+            logger.warning('El listado cambió durante la descarga; revisando registros faltantes')
+            for record in self._iter_pages(fetch_page, dict(params, page=first_page), per_page, prefetch=True):
+                record_id = record.get('id')
+                if record_id is None or record_id not in seen:
+                    seen.add(record_id)
+                    yield record
+    
+    def _find_existing_shipment(self, payload: Dict, created_at: float) -> Optional[str]:
+        """Busca un envío creado desde `created_at` con el mismo rate_id"""
+        rate_id = payload.get('shipment', {}).get('rate_id')
+        if not rate_id:
+            return None
+        
+        # Un día antes por diferencias de zona horaria con el servidor
+        since = (datetime.fromtimestamp(created_at) - timedelta(days=1)).strftime('%Y-%m-%d')
+        shipments = self._iter_pages(self.get_shipments, {'created_at_from': since}, 100, prefetch=False)
+        
+        for shipment in itertools.islice(shipments, self.IDEMPOTENCY_LOOKUP_PAGES * 100):
+            attrs = shipment.get('attributes', {})
+            rate = shipment.get('relationships', {}).get('rate', {}).get('data') or {}
+            if rate_id in (attrs.get('rate_id'), rate.get('id')):
+                return shipment.get('id')
+        
+        return None
+    
+    def _find_existing_pickup(self, payload: Dict, created_at: float) -> Optional[str]:
+        """Busca una recolección con la misma fecha y los mismos envíos"""
+        pickup = payload.get('pickup', {})
+        pickup_date = pickup.get('pickup_date')
+        shipment_ids = set(pickup.get('shipment_ids') or [])
+        if not pickup_date or not shipment_ids:
+            return None
+        
+        pickups = self._iter_pages(
+            self.get_pickups,
+            {'pickup_date_from': pickup_date, 'pickup_date_to': pickup_date},
+            100,
+            prefetch=False
+        )
+        
+        for item in itertools.islice(pickups, self.IDEMPOTENCY_LOOKUP_PAGES * 100):
+            shipments = item.get('relationships', {}).get('shipments', {}).get('data') or []
+            if {s.get('id') for s in shipments} == shipment_ids:
+                return item.get('id')
+        
+        return None
     
     # ============= AUTENTICACIÓN =============
     
@@ -174,16 +1090,24 @@ class SkydropxClient:
             'grant_type': 'client_credentials'
         }
         
-        response = self._request(
-            'POST',
-            '/api/v1/oauth/token',
-            data=data,
-            requires_auth=False
-        )
-        
-        self.access_token = response['access_token']
-        expires_in = response.get('expires_in', 7200)
-        self.token_expires_at = datetime.now() + timedelta(seconds=expires_in)
+        with self._token_lock:
+            response = self._request(
+                'POST',
+                '/api/v1/oauth/token',
+                data=data,
+                requires_auth=False
+            )
+            
+            self.access_token = response['access_token']
+            expires_in = response.get('expires_in', 7200)
+            self.token_expires_at = datetime.now() + timedelta(seconds=expires_in)
+            
+            if self.token_store is not None:
+                self.token_store.save(
+                    self._token_store_key,
+                    self.access_token,
+                    self.token_expires_at.timestamp()
+                )
         
         return response
     
@@ -206,6 +1130,9 @@ class SkydropxClient:
         self.access_token = None
         self.token_expires_at = None
         
+        if self.token_store is not None:
+            self.token_store.delete(self._token_store_key)
+        
         return response
     
     def introspect_token(self) -> Dict:
@@ -257,47 +1184,298 @@ class SkydropxClient:
             f'/api/v1/quotations/{quotation_id}'
         )
     
-    def wait_for_quotation(self, quotation_id: str, max_attempts: int = 15, sleep_seconds: int = 2) -> Dict:
+    def _poll_quotation(
+        self,
+        quotation_id: str,
+        max_attempts: Optional[int],
+        sleep_seconds: Optional[float],
+        timeout: Optional[float]
+    ) -> Iterator[Dict]:
+        """
+        Consulta la cotización hasta que se complete, entregando cada respuesta
+        
+        Usa poll_intervals() salvo que se fije sleep_seconds. Lanza
+        SkydropxError si se agotan los intentos o el plazo `timeout`.
+        """
+        deadline = time.monotonic() + timeout if timeout is not None else None
+        # client.deadline() también acota el polling
+        call_deadline = self._current_deadline()
+        if call_deadline is not None:
+            deadline = call_deadline if deadline is None else min(deadline, call_deadline)
+        intervals = itertools.repeat(sleep_seconds) if sleep_seconds is not None else poll_intervals()
+        attempts = 0
+        
+        while True:
+            quotation = self.get_quotation(quotation_id)
+            attempts += 1
+            
+            yield quotation
+            
+            if quotation.get('is_completed'):
+                return
+            
+            if max_attempts is not None and attempts >= max_attempts:
+                break
+            
+            delay = next(intervals)
+            
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                delay = min(delay, remaining)
+            
+            time.sleep(delay)
+        
+        raise SkydropxError('Timeout esperando cotización - Intenta más tarde')
+    
+    def wait_for_quotation(
+        self,
+        quotation_id: str,
+        max_attempts: Optional[int] = None,
+        sleep_seconds: Optional[float] = None,
+        timeout: Optional[float] = 30.0
+    ) -> Dict:
         """
         Espera a que una cotización se complete (polling)
         
+        Por defecto consulta rápido al inicio (0.25s) y va espaciando las
+        consultas hasta 4s, sin pasar de `timeout` segundos en total.
+        
         Args:
             quotation_id: ID de la cotización
-            max_attempts: Número máximo de intentos
-            sleep_seconds: Segundos entre intentos
+            max_attempts: Número máximo de intentos (default: sin límite, solo timeout)
+            sleep_seconds: Segundos fijos entre intentos (default: intervalos adaptativos)
+            timeout: Plazo total en segundos (default: 30)
             
         Returns:
             Dict con cotización completada
         """
-        attempts = 0
-        
-        while attempts < max_attempts:
-            quotation = self.get_quotation(quotation_id)
-            
+        for quotation in self._poll_quotation(quotation_id, max_attempts, sleep_seconds, timeout):
             if quotation.get('is_completed'):
                 return quotation
+    
+    def iter_quotation_rates(
+        self,
+        quotation_id: str,
+        sleep_seconds: Optional[float] = None,
+        timeout: Optional[float] = 30.0
+    ) -> Iterator[Dict]:
+        """
+        Entrega las tarifas conforme cada paquetería responde
+        
+        Permite mostrar los primeros precios en el checkout antes de que
+        termine la paquetería más lenta. Cada tarifa se entrega una sola vez;
+        las tarifas con success=False se omiten.
+        
+        Args:
+            quotation_id: ID de la cotización
+            sleep_seconds: Segundos fijos entre consultas (default: intervalos adaptativos)
+            timeout: Plazo total en segundos (default: 30)
             
-            time.sleep(sleep_seconds)
-            attempts += 1
+        Yields:
+            Dict de cada tarifa nueva
+        """
+        seen = set()
         
-        raise SkydropxError('Timeout esperando cotización - Intenta más tarde')
+        for quotation in self._poll_quotation(quotation_id, None, sleep_seconds, timeout):
+            for rate in quotation.get('rates') or []:
+                rate_id = rate.get('id')
+                if rate_id in seen or rate.get('success') is False:
+                    continue
+                seen.add(rate_id)
+                yield rate
+    
+    def quote(self, quotation_data: Dict, timeout: Optional[float] = 30.0) -> Dict:
+        """
+        Crea una cotización y espera a que se complete
+        
+        Con quote_cache, una ruta ya cotizada se devuelve desde la caché sin
+        llamar a la API.
+        
+        Args:
+            quotation_data: Datos de la cotización
+            timeout: Plazo total de espera en segundos (default: 30)
+            
+        Returns:
+            Dict con cotización completada
+        """
+        if self.quote_cache is not None:
+            cached = self.quote_cache.get_quotation(quotation_data)
+            if cached is not None:
+                return cached
+        
+        quotation = self.create_quotation(quotation_data)
+        
+        if not quotation.get('is_completed'):
+            quotation = self.wait_for_quotation(quotation['id'], timeout=timeout)
+        
+        if self.quote_cache is not None:
+            self.quote_cache.set_quotation(quotation_data, quotation)
+        
+        return quotation
+    
+    def quote_many(
+        self,
+        quotations: Iterable[Dict],
+        max_in_flight: int = 20,
+        workers: int = 4,
+        timeout: Optional[float] = 30.0
+    ) -> Iterator[Tuple[int, Union[Dict, SkydropxError]]]:
+        """
+        Cotiza muchos envíos manteniendo hasta `max_in_flight` cotizaciones en vuelo
+        
+        Un solo planificador decide qué cotización pendiente consultar a
+        continuación (la que tiene el próximo poll más cercano, con los
+        intervalos de poll_intervals()) y reparte las peticiones entre
+        `workers` hilos. El limitador de tasa del cliente sigue aplicando, así
+        que el throughput queda acotado por la API y no por time.sleep.
+        
+        Args:
+            quotations: Datos de cada cotización (como en create_quotation)
+            max_in_flight: Cotizaciones creadas y aún sin completar (default: 20)
+            workers: Peticiones HTTP simultáneas (default: 4)
+            timeout: Plazo por cotización desde su creación (default: 30)
+            
+        Yields:
+            (índice en `quotations`, cotización completada o SkydropxError),
+            en el orden en que van terminando
+        """
+        pending = iter(enumerate(quotations))
+        requests_by_index: Dict[int, Dict] = {}
+        exhausted = False
+        in_flight = 0
+        scheduled: List[Tuple[float, int, str, Iterator[float], Optional[float]]] = []
+        running: Dict[Any, Tuple] = {}
+        
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='skydropx-quote')
+        # Los hilos del pool respetan el deadline de quien itera
+        get_quotation = self._bind_deadline(self.get_quotation)
+        create_quotation = self._bind_deadline(self.create_quotation)
+        call_deadline = self._current_deadline()
+        
+        try:
+            while True:
+                now = time.monotonic()
+                
+                if call_deadline is not None and now >= call_deadline:
+                    # Plazo agotado: lo que falta termina con error, sin más peticiones
+                    expired = [entry[1] for entry in running.values()]
+                    expired += [entry[1] for entry in scheduled]
+                    expired += [index for index, _ in pending]
+                    for future in running:
+                        future.cancel()
+                    for index in expired:
+                        yield index, SkydropxError('Plazo excedido - La operación superó su deadline')
+                    return
+                
+                # Primero las consultas que ya tocan: completan cotizaciones
+                while scheduled and scheduled[0][0] <= now and len(running) < workers:
+                    _, index, quotation_id, intervals, deadline = heapq.heappop(scheduled)
+                    future = executor.submit(get_quotation, quotation_id)
+                    running[future] = ('poll', index, quotation_id, intervals, deadline)
+                
+                # Después, nuevas cotizaciones mientras haya cupo
+                while not exhausted and in_flight < max_in_flight and len(running) < workers:
+                    try:
+                        index, quotation_data = next(pending)
+                    except StopIteration:
+                        exhausted = True
+                        break
+                    
+                    if self.quote_cache is not None:
+                        cached = self.quote_cache.get_quotation(quotation_data)
+                        if cached is not None:
+                            yield index, cached
+                            continue
+                        requests_by_index[index] = quotation_data
+                    
+                    future = executor.submit(create_quotation, quotation_data)
+                    running[future] = ('create', index, None, None, None)
+                    in_flight += 1
+                
+                if not running and not scheduled:
+                    if exhausted:
+                        return
+                    continue
+                
+                if not running:
+                    # Nada en vuelo: dormir hasta el próximo poll programado
+                    wake_at = scheduled[0][0] if call_deadline is None else min(scheduled[0][0], call_deadline)
+                    time.sleep(max(0.0, wake_at - now))
+                    continue
+                
+                # Con todos los workers ocupados solo importa que alguno termine
+                wait_timeout = None
+                if scheduled and len(running) < workers:
+                    wait_timeout = max(0.0, scheduled[0][0] - now)
+                if call_deadline is not None:
+                    remaining = max(0.0, call_deadline - now)
+                    wait_timeout = remaining if wait_timeout is None else min(wait_timeout, remaining)
+                
+                done, _ = wait(list(running), timeout=wait_timeout, return_when=FIRST_COMPLETED)
+                
+                for future in done:
+                    kind, index, quotation_id, intervals, deadline = running.pop(future)
+                    
+                    try:
+                        quotation = future.result()
+                    except SkydropxError as e:
+                        in_flight -= 1
+                        requests_by_index.pop(index, None)
+                        yield index, e
+                        continue
+                    
+                    now = time.monotonic()
+                    
+                    if kind == 'create':
+                        quotation_id = quotation.get('id')
+                        intervals = poll_intervals()
+                        deadline = now + timeout if timeout is not None else None
+                    
+                    if quotation.get('is_completed'):
+                        in_flight -= 1
+                        if index in requests_by_index:
+                            self.quote_cache.set_quotation(requests_by_index.pop(index), quotation)
+                        yield index, quotation
+                        continue
+                    
+                    if deadline is not None and now >= deadline:
+                        in_flight -= 1
+                        requests_by_index.pop(index, None)
+                        yield index, SkydropxError('Timeout esperando cotización - Intenta más tarde')
+                        continue
+                    
+                    due = now + next(intervals)
+                    if deadline is not None:
+                        due = min(due, deadline)
+                    heapq.heappush(scheduled, (due, index, quotation_id, intervals, deadline))
+        finally:
+            executor.shutdown(wait=False)
     
     # ============= ENVÍOS =============
     
-    def create_shipment(self, shipment_data: Dict) -> Dict:
+    def create_shipment(self, shipment_data: Dict, idempotency_key: Optional[str] = None) -> Dict:
         """
         Crea un envío
         
+        Reintentar con el mismo idempotency_key nunca genera una segunda
+        guía: antes de repetir el POST se busca el envío ya creado.
+        
         Args:
             shipment_data: Datos del envío
+            idempotency_key: Llave estable de la operación (ej. 'order-1234')
             
         Returns:
             Dict con información del envío
         """
-        return self._request(
-            'POST',
+        return self._idempotent_create(
+            'shipment',
             '/api/v1/shipments',
-            data={'shipment': shipment_data}
+            {'shipment': shipment_data},
+            idempotency_key,
+            self._find_existing_shipment,
+            self.get_shipment
         )
     
     def get_shipments(self, params: Optional[Dict] = None) -> Dict:
@@ -316,6 +1494,34 @@ class SkydropxClient:
             params=params
         )
     
+    def iter_shipments(
+        self,
+        filters: Optional[Dict] = None,
+        per_page: int = 100,
+        prefetch: bool = True,
+        concurrency: int = 1,
+        ordered: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Recorre todos los envíos página por página con memoria constante
+        
+        Con concurrency > 1, tras la primera página descarga las restantes en
+        paralelo (útil para descargas completas como una conciliación).
+        
+        Args:
+            filters: Filtros (status, created_at_from, etc)
+            per_page: Registros por página (default: 100, máximo de la API)
+            prefetch: Descargar la siguiente página mientras se procesa la actual
+            concurrency: Páginas descargadas en paralelo (default: 1)
+            ordered: Con concurrency > 1, entregar en orden de página (default: True)
+            
+        Yields:
+            Dict de cada envío
+        """
+        if concurrency > 1:
+            return self._iter_pages_parallel(self.get_shipments, filters, per_page, concurrency, ordered)
+        return self._iter_pages(self.get_shipments, filters, per_page, prefetch)
+    
     def get_shipment(self, shipment_id: str) -> Dict:
         """
         Obtiene un envío por ID
@@ -403,6 +1609,67 @@ class SkydropxClient:
             data={'trackings': trackings}
         )
     
+    def track_bulk(
+        self,
+        trackings: Iterable[Dict],
+        chunk_size: int = 50,
+        concurrency: int = 4,
+        retry_rounds: int = 1
+    ) -> BulkTrackingResult:
+        """
+        Rastrea listas grandes de guías en bloques paralelos
+        
+        Divide las guías (sin duplicados) en bloques de `chunk_size`, envía
+        hasta `concurrency` bloques a la vez a /api/v1/tracking/bulk (el rate
+        limiter del cliente sigue marcando el ritmo) y junta los resultados
+        por (tracking_number, carrier_code). Las guías con success=False, sin
+        respuesta o cuyo bloque falló se reenvían hasta `retry_rounds` veces.
+        
+        Args:
+            trackings: Dicts con tracking_number y carrier_code
+            chunk_size: Guías por petición (default: 50)
+            concurrency: Bloques en vuelo a la vez (default: 4)
+            retry_rounds: Rondas de reintento para las guías fallidas (default: 1)
+            
+        Returns:
+            BulkTrackingResult con results, failed y retry_batch
+        """
+        result = BulkTrackingResult()
+        pending = unique_trackings(trackings)
+        
+        if not pending:
+            return result
+        
+        executor = ThreadPoolExecutor(
+            max_workers=max(1, min(concurrency, -(-len(pending) // chunk_size))),
+            thread_name_prefix='skydropx-track'
+        )
+        
+        try:
+            for _ in range(retry_rounds + 1):
+                chunks = [pending[i:i + chunk_size] for i in range(0, len(pending), chunk_size)]
+                track_chunk = self._bind_deadline(self.track_multiple_shipments)
+                futures = [(chunk, executor.submit(track_chunk, chunk)) for chunk in chunks]
+                result.rounds += 1
+                
+                for chunk, future in futures:
+                    result.requests += 1
+                    try:
+                        response = future.result()
+                    except SkydropxError as e:
+                        logger.warning("Falló un bloque de %d guías: %s", len(chunk), e.message)
+                        result.fail_chunk(chunk, e.message)
+                        continue
+                    result.merge(chunk, response.get('data') or [])
+                
+                pending = result.retry_batch
+                if not pending:
+                    break
+        finally:
+            executor.shutdown(wait=True)
+        
+        return result
+    
     # ============= RECOLECCIONES =============
     
     def get_pickup_coverage(self, postal_code: str, country_code: str = 'MX') -> Dict:
@@ -425,20 +1692,24 @@ class SkydropxClient:
             }
         )
     
-    def create_pickup(self, pickup_data: Dict) -> Dict:
+    def create_pickup(self, pickup_data: Dict, idempotency_key: Optional[str] = None) -> Dict:
         """
         Programa una recolección
         
         Args:
             pickup_data: Datos de la recolección
+            idempotency_key: Llave estable de la operación (ver create_shipment)
             
         Returns:
             Dict con información de la recolección
         """
-        return self._request(
-            'POST',
+        return self._idempotent_create(
+            'pickup',
             '/api/v1/pickups',
-            data={'pickup': pickup_data}
+            {'pickup': pickup_data},
+            idempotency_key,
+            self._find_existing_pickup,
+            self.get_pickup
         )
     
     def get_pickups(self, params: Optional[Dict] = None) -> Dict:
@@ -457,6 +1728,46 @@ class SkydropxClient:
             params=params
         )
     
+    def iter_pickups(
+        self,
+        filters: Optional[Dict] = None,
+        per_page: int = 100,
+        prefetch: bool = True,
+        concurrency: int = 1,
+        ordered: bool = True
+    ) -> Iterator[Dict]:
+        """
+        Recorre todas las recolecciones página por página con memoria constante
+        
+        Args:
+            filters: Filtros (status, pickup_date_from, carrier_code, etc)
+            per_page: Registros por página (default: 100, máximo de la API)
+            prefetch: Descargar la siguiente página mientras se procesa la actual
+            concurrency: Páginas descargadas en paralelo (ver iter_shipments)
+            ordered: Con concurrency > 1, entregar en orden de página (default: True)
+            
+        Yields:
+            Dict de cada recolección
+        """
+        if concurrency > 1:
+            return self._iter_pages_parallel(self.get_pickups, filters, per_page, concurrency, ordered)
+        return self._iter_pages(self.get_pickups, filters, per_page, prefetch)
+    
+    def get_pickup(self, pickup_id: str) -> Dict:
+        """
+        Obtiene una recolección por ID
+        
+        Args:
+            pickup_id: ID de la recolección
+            
+        Returns:
+            Dict con información de la recolección
+        """
+        return self._request(
+            'GET',
+            f'/api/v1/pickups/{pickup_id}'
+        )
+    
     def reschedule_pickup(self, pickup_id: str, pickup_data: Dict) -> Dict:
         """
         Reprograma una recolección
@@ -551,35 +1862,62 @@ class SkydropxClient:
             'has_valid_token': bool(self.access_token and not self._should_renew_token()),
             'token_expires_at': self.token_expires_at.isoformat() if self.token_expires_at else None
         }
+    
+    def get_rate_limit_stats(self) -> Dict:
+        """
+        Obtiene cuánto han esperado las peticiones en el limitador de tasa
+        
+        Returns:
+            Dict bucket -> {requests, delayed, total_wait, max_wait}
+        """
+        return self.rate_limiter.stats() if self.rate_limiter else {}
+    
+    def get_retry_stats(self) -> Dict[str, int]:
+        """
+        Obtiene cuántas veces se reintentó cada endpoint
+        
+        Returns:
+            Dict 'MÉTODO /ruta/{id}' -> número de reintentos
+        """
+        with self._retry_lock:
+            return dict(self._retry_counts)
+    
+    def get_coalescing_stats(self) -> Dict[str, int]:
+        """
+        Obtiene cuántos GET fueron a la API y cuántos reutilizaron una petición en vuelo
+        
+        Returns:
+            Dict con 'upstream' (peticiones reales) y 'shared' (llamadas que esperaron a otra)
+        """
+        with self._flights_lock:
+            return dict(self._coalesce_stats)
+
+
+@lru_cache(maxsize=16)
+def _webhook_verifier(secret: str) -> WebhookVerifier:
+    """Verificador pre-inicializado por secret, reutilizado entre llamadas"""
+    return WebhookVerifier(secret, tolerance=None)
 
 
-def verify_webhook_signature(signature: str, timestamp: str, payload: str, secret: str) -> bool:
+def verify_webhook_signature(
+    signature: str,
+    timestamp: str,
+    payload: Union[str, bytes, bytearray, memoryview],
+    secret: str
+) -> bool:
     """
     Verifica la firma HMAC de un webhook
     
+    Para tráfico alto usa directamente un WebhookVerifier (ver webhooks.py),
+    que además valida la antigüedad del timestamp y parsea el evento.
+    
     Args:
         signature: Firma del header X-Skydropx-Signature
         timestamp: Timestamp del header X-Skydropx-Timestamp
-        payload: Body del request como string
+        payload: Body del request (de preferencia los bytes crudos)
         secret: Secret del webhook
         
     Returns:
         True si la firma es válida
     """
-    import hmac
-    import hashlib
-    
-    # Crear payload firmado
-    signed_payload = f"{timestamp}.{payload}"
-    
-    # Calcular HMAC-SHA512
-    expected_signature = hmac.new(
-        secret.encode(),
-        signed_payload.encode(),
-        hashlib.sha512
-    ).hexdigest()
-    
-    # Comparar (time-safe)
-    signature_without_prefix = signature.replace('sha512=', '')
-    
-    return hmac.compare_digest(signature_without_prefix, expected_signature)
+    return _webhook_verifier(secret).verify(signature, timestamp, payload)
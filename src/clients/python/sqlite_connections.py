@@ -0,0 +1,52 @@
+"""
+Conexiones SQLite por hilo y por proceso
+
+Un objeto sqlite3.Connection no debe usarse desde varios hilos a la vez ni
+heredarse tras un fork. SQLiteConnections abre una conexión por hilo y la
+reemplaza si el PID cambió; la usan SQLiteRateLimiter,
+SQLiteIdempotencyJournal y SQLiteEventDedupStore.
+
+Uso:
+    from sqlite_connections import SQLiteConnections
+
+    connections = SQLiteConnections('/var/lib/app/datos.db', timeout=10)
+    connections.get().execute('SELECT 1')
+"""
+
+import os
+import sqlite3
+import threading
+from typing import Any, Callable, Optional
+
+
+class SQLiteConnections:
+    """
+    Una conexión SQLite en autocommit por hilo, renovada tras un fork
+
+    Args:
+        path: Ruta del archivo SQLite (se crea si no existe)
+        timeout: Segundos máximos esperando el lock del archivo (default: 10)
+        row_factory: row_factory de cada conexión (ej. sqlite3.Row; opcional)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        timeout: float = 10.0,
+        row_factory: Optional[Callable[[sqlite3.Cursor, tuple], Any]] = None
+    ):
+        self.path = path
+        self.timeout = timeout
+        self.row_factory = row_factory
+        self._local = threading.local()
+
+    def get(self) -> sqlite3.Connection:
+        """Conexión propia del hilo y proceso actuales"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or self._local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            if self.row_factory is not None:
+                conn.row_factory = self.row_factory
+            self._local.conn = conn
+            self._local.pid = os.getpid()
+        return conn
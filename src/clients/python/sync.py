@@ -0,0 +1,272 @@
+"""
+Sincronización incremental de envíos
+
+En lugar de volver a listar todo el historial para encontrar los pocos
+envíos que cambiaron, ShipmentSync guarda una marca de agua (el mayor
+updated_at/created_at visto) y en cada corrida solo recorre los registros
+más nuevos, deteniendo la paginación al llegar a datos ya conocidos (solo
+si el listado resulta venir del más reciente al más antiguo).
+
+Uso:
+    from sync import ShipmentSync, FileCursorStore
+
+    sync = ShipmentSync(client, FileCursorStore('/var/lib/app/skydropx-cursors.json'))
+    delta = sync.run()
+
+    for shipment in delta.created:
+        insert(shipment)
+    for shipment in delta.updated:
+        update(shipment)
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+
+logger = logging.getLogger(__name__)
+
+
+def parse_timestamp(value: Optional[str]) -> Optional[datetime]:
+    """Convierte un timestamp ISO 8601 de la API ('2024-01-15T10:30:00.000Z') a datetime"""
+    if not value:
+        return None
+    try:
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
+    except ValueError:
+        return None
+
+
+class CursorStore:
+    """Almacén en memoria de cursores de sincronización, por nombre"""
+
+    def __init__(self):
+        self._cursors: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+
+    def load(self, name: str) -> Optional[Dict]:
+        """Obtiene el cursor `name`, o None si nunca se ha sincronizado"""
+        with self._lock:
+            cursor = self._cursors.get(name)
+            return dict(cursor) if cursor else None
+
+    def save(self, name: str, cursor: Dict) -> None:
+        """Guarda el cursor `name`"""
+        with self._lock:
+            self._cursors[name] = dict(cursor)
+
+
+class FileCursorStore(CursorStore):
+    """
+    Cursores persistidos en un archivo JSON (escritura atómica)
+
+    Args:
+        path: Ruta del archivo (acepta ~)
+    """
+
+    def __init__(self, path: str):
+        super().__init__()
+        self.path = os.path.expanduser(path)
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def load(self, name: str) -> Optional[Dict]:
+        with self._lock:
+            return self._read().get(name)
+
+    def save(self, name: str, cursor: Dict) -> None:
+        with self._lock:
+            cursors = self._read()
+            cursors[name] = cursor
+
+            directory = os.path.dirname(self.path) or '.'
+            fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.skydropx-cursors-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(cursors, f)
+                os.replace(tmp_path, self.path)
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+
+class SyncDelta:
+    """
+    Resultado de una corrida de sincronización
+
+    Attributes:
+        created: Envíos creados después de la marca de agua anterior
+        updated: Envíos existentes que cambiaron desde la marca anterior
+        cursor: Cursor nuevo (se guarda con commit())
+        scanned: Registros recorridos en la corrida
+    """
+
+    def __init__(self, created: List[Dict], updated: List[Dict], cursor: Dict, scanned: int):
+        self.created = created
+        self.updated = updated
+        self.cursor = cursor
+        self.scanned = scanned
+
+    def __len__(self) -> int:
+        return len(self.created) + len(self.updated)
+
+
+class ShipmentSync:
+    """
+    Sincronización incremental de envíos con marca de agua persistida
+
+    Se detiene tras `stop_after_known` registros seguidos que no superan la
+    marca de agua, así el costo depende de cuántos envíos cambiaron y no del
+    historial total. El corte temprano solo se aplica si los timestamps
+    recorridos confirman que el listado va del más reciente al más antiguo
+    por `field` (al menos un descenso y ningún ascenso); si no, se recorre
+    el listado completo y se registra un warning. Con field='created_at'
+    además filtra en el servidor con created_at_from.
+
+    Args:
+        client: SkydropxClient
+        store: Almacén de cursores (default: en memoria)
+        name: Nombre del cursor en el almacén (default: 'shipments')
+        field: Atributo usado como marca de agua: 'updated_at' o 'created_at'
+        filters: Filtros adicionales para el listado
+        stop_after_known: Registros conocidos seguidos antes de detenerse (default: 100)
+    """
+
+    def __init__(
+        self,
+        client,
+        store: Optional[CursorStore] = None,
+        name: str = 'shipments',
+        field: str = 'updated_at',
+        filters: Optional[Dict] = None,
+        stop_after_known: int = 100
+    ):
+        self.client = client
+        self.store = store or CursorStore()
+        self.name = name
+        self.field = field
+        self.filters = filters or {}
+        self.stop_after_known = stop_after_known
+
+    def _record_time(self, record: Dict) -> Optional[datetime]:
+        attrs = record.get('attributes', {})
+        return parse_timestamp(attrs.get(self.field) or attrs.get('created_at'))
+
+    def run(self, commit: bool = True) -> SyncDelta:
+        """
+        Obtiene los envíos nuevos y actualizados desde la última corrida
+
+        Args:
+            commit: Guardar el cursor nuevo al terminar (default: True). Usa
+                commit=False y luego commit(delta) para avanzar el cursor solo
+                después de procesar el delta.
+
+        Returns:
+            SyncDelta con created, updated y el cursor nuevo
+        """
+        cursor = self.store.load(self.name) or {}
+        watermark = parse_timestamp(cursor.get('watermark'))
+        # IDs ya entregados con timestamp igual a la marca (empates)
+        ids_at_watermark = {str(i) for i in cursor.get('ids') or []}
+
+        filters = dict(self.filters)
+        if watermark is not None and self.field == 'created_at':
+            # Un día de margen por la granularidad del filtro (YYYY-MM-DD)
+            filters.setdefault('created_at_from', (watermark - timedelta(days=1)).strftime('%Y-%m-%d'))
+
+        created: List[Dict] = []
+        updated: List[Dict] = []
+        new_watermark = watermark
+        new_ids = set(ids_at_watermark)
+        known_streak = 0
+        scanned = 0
+        # Orden observado: el corte temprano solo es seguro si es descendente
+        previous_time = None
+        descending = False
+        ascending = False
+        full_scan = False
+
+        for record in self.client.iter_shipments(filters):
+            scanned += 1
+            record_time = self._record_time(record)
+            # El cursor guarda los IDs como texto: la API puede mandarlos como número
+            record_id = record.get('id')
+            record_id = str(record_id) if record_id is not None else None
+
+            if record_time is not None:
+                if previous_time is not None:
+                    if record_time < previous_time:
+                        descending = True
+                    elif record_time > previous_time:
+                        ascending = True
+                previous_time = record_time
+
+            is_new = (
+                watermark is None
+                or record_time is None
+                or record_time > watermark
+                or (record_time == watermark and record_id not in ids_at_watermark)
+            )
+
+            if not is_new:
+                known_streak += 1
+                if known_streak >= self.stop_after_known:
+                    if descending and not ascending:
+                        break
+                    full_scan = True
+                continue
+
+            known_streak = 0
+            created_at = parse_timestamp(record.get('attributes', {}).get('created_at'))
+
+            if watermark is None or created_at is None or created_at > watermark:
+                created.append(record)
+            else:
+                updated.append(record)
+
+            if record_time is not None:
+                if new_watermark is None or record_time > new_watermark:
+                    new_watermark = record_time
+                    new_ids = {record_id}
+                elif record_time == new_watermark:
+                    new_ids.add(record_id)
+
+        if full_scan:
+            logger.warning(
+                "ShipmentSync '%s': el listado no viene del más reciente al más antiguo por %s; "
+                "se recorrió completo (%d registros). Agrega el parámetro de orden en `filters`.",
+                self.name, self.field, scanned
+            )
+
+        new_cursor = {
+            'watermark': new_watermark.isoformat() if new_watermark else None,
+            'ids': sorted(str(i) for i in new_ids if i is not None),
+            'synced_at': datetime.now().isoformat()
+        }
+        delta = SyncDelta(created, updated, new_cursor, scanned)
+
+        if commit:
+            self.commit(delta)
+
+        return delta
+
+    def commit(self, delta: SyncDelta) -> None:
+        """Avanza el cursor persistido al de `delta`"""
+        self.store.save(self.name, delta.cursor)
+
+    def reset(self) -> None:
+        """Olvida la marca de agua: la próxima corrida recorre todo el historial"""
+        self.store.save(self.name, {})
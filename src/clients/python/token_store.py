@@ -0,0 +1,166 @@
+"""
+Almacenes de tokens OAuth para el cliente de Skydropx
+
+Un token de /api/v1/oauth/token es válido por ~2 horas. Con un TokenStore,
+los procesos de vida corta (cron, serverless, workers que reinician)
+reutilizan el token vigente en lugar de autenticarse en cada arranque.
+
+Uso:
+    from token_store import FileTokenStore
+
+    client = SkydropxClient(
+        ...,
+        token_store=FileTokenStore('~/.cache/skydropx/tokens.json')
+    )
+"""
+
+import json
+import os
+import tempfile
+import threading
+from abc import ABC, abstractmethod
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: sin lock entre procesos
+    fcntl = None
+
+
+class TokenStore(ABC):
+    """
+    Interfaz de almacén de tokens
+
+    Las llaves identifican cliente y entorno (ej. 'sandbox:client_id'); los
+    valores son (access_token, expires_at) con expires_at en epoch seconds.
+    """
+
+    @abstractmethod
+    def load(self, key: str) -> Optional[Tuple[str, float]]:
+        """Obtiene el token guardado para `key`, o None"""
+
+    @abstractmethod
+    def save(self, key: str, access_token: str, expires_at: float) -> None:
+        """Guarda el token de `key`"""
+
+    @abstractmethod
+    def delete(self, key: str) -> None:
+        """Elimina el token de `key`"""
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        Lock exclusivo mientras se renueva el token de `key`
+
+        Evita que varios procesos se autentiquen a la vez. Por defecto no
+        hace nada.
+        """
+        yield
+
+
+class MemoryTokenStore(TokenStore):
+    """Almacén en memoria, compartible entre varios clientes del mismo proceso"""
+
+    def __init__(self):
+        self._tokens: Dict[str, Tuple[str, float]] = {}
+        self._lock = threading.Lock()
+
+    def load(self, key: str) -> Optional[Tuple[str, float]]:
+        with self._lock:
+            return self._tokens.get(key)
+
+    def save(self, key: str, access_token: str, expires_at: float) -> None:
+        with self._lock:
+            self._tokens[key] = (access_token, expires_at)
+
+    def delete(self, key: str) -> None:
+        with self._lock:
+            self._tokens.pop(key, None)
+
+
+class FileTokenStore(TokenStore):
+    """
+    Almacén en un archivo JSON compartido entre procesos y reinicios
+
+    Las escrituras son atómicas (archivo temporal + os.replace) y el archivo
+    se crea con permisos 0600. `lock()` toma un flock exclusivo sobre
+    `<path>.lock`, de modo que solo un proceso renueva el token mientras los
+    demás esperan y luego leen el token nuevo.
+
+    Args:
+        path: Ruta del archivo de tokens (acepta ~)
+    """
+
+    def __init__(self, path: str):
+        self.path = os.path.expanduser(path)
+        self.lock_path = f'{self.path}.lock'
+        self._thread_lock = threading.RLock()
+        self._lock_depth = 0
+
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _read(self) -> Dict[str, Dict]:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError):
+            return {}
+
+    def _write(self, tokens: Dict[str, Dict]) -> None:
+        directory = os.path.dirname(self.path) or '.'
+        fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.skydropx-tokens-')
+
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(tokens, f)
+            os.chmod(tmp_path, 0o600)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def load(self, key: str) -> Optional[Tuple[str, float]]:
+        entry = self._read().get(key)
+        if not entry:
+            return None
+        return entry['access_token'], float(entry['expires_at'])
+
+    def save(self, key: str, access_token: str, expires_at: float) -> None:
+        with self.lock(key):
+            tokens = self._read()
+            tokens[key] = {'access_token': access_token, 'expires_at': expires_at}
+            self._write(tokens)
+
+    def delete(self, key: str) -> None:
+        with self.lock(key):
+            tokens = self._read()
+            if tokens.pop(key, None) is not None:
+                self._write(tokens)
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        # flock es por proceso; el RLock serializa los hilos y permite reentrar
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+
+            if self._lock_depth:
+                self._lock_depth += 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth -= 1
+                return
+
+            with open(self.lock_path, 'a') as lock_file:
+                fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX)
+                self._lock_depth = 1
+                try:
+                    yield
+                finally:
+                    self._lock_depth = 0
+                    fcntl.flock(lock_file.fileno(), fcntl.LOCK_UN)
@@ -0,0 +1,371 @@
+"""
+Rastreo masivo de envíos
+
+`SkydropxClient.track_bulk()` divide listas grandes de guías en bloques
+para /api/v1/tracking/bulk, los envía en paralelo (respetando el rate
+limiter del cliente) y junta los resultados en un solo mapa por
+(tracking_number, carrier_code). Las guías que fallan se reenvían en una
+ronda de reintento y las que siguen fallando quedan en `retry_batch`.
+
+`TrackingWatcher` mantiene frescas miles de guías activas: consulta cada
+una según su estado actual, agrupa las que toca consultar en llamadas a
+/tracking/bulk y deja de seguir las entregadas, canceladas o devueltas.
+
+Uso:
+    result = client.track_bulk(trackings, chunk_size=50, concurrency=4)
+
+    for (tracking_number, carrier_code), item in result.results.items():
+        print(tracking_number, item['status'])
+
+    # Guías que no se pudieron rastrear, listas para reenviar más tarde
+    later = result.retry_batch
+
+    watcher = TrackingWatcher(client, on_change=lambda change: notify(change))
+    watcher.watch('794874381730', 'fedex')
+    watcher.run()
+"""
+
+import heapq
+import itertools
+import json
+import logging
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+TrackingKey = Tuple[str, str]
+
+
+def tracking_key(item: Dict) -> TrackingKey:
+    """Llave (tracking_number, carrier_code) de una guía o de un resultado"""
+    return str(item.get('tracking_number', '')).strip(), str(item.get('carrier_code', '')).strip().lower()
+
+
+def unique_trackings(trackings: Iterable[Dict]) -> List[Dict]:
+    """Normaliza las guías a {tracking_number, carrier_code} sin duplicados, conservando el orden"""
+    seen = set()
+    unique = []
+    for item in trackings:
+        key = tracking_key(item)
+        if key in seen:
+            continue
+        seen.add(key)
+        unique.append({'tracking_number': key[0], 'carrier_code': key[1]})
+    return unique
+
+
+class BulkTrackingResult:
+    """
+    Resultado combinado de un rastreo masivo
+
+    Attributes:
+        results: (tracking_number, carrier_code) -> item con success=True
+        failed: (tracking_number, carrier_code) -> item fallido (con 'error')
+        requests: Peticiones a /api/v1/tracking/bulk realizadas
+        rounds: Rondas ejecutadas (1 + reintentos)
+    """
+
+    def __init__(self):
+        self.results: Dict[TrackingKey, Dict] = {}
+        self.failed: Dict[TrackingKey, Dict] = {}
+        self.requests = 0
+        self.rounds = 0
+
+    @property
+    def retry_batch(self) -> List[Dict]:
+        """Guías fallidas como lista de {tracking_number, carrier_code}, lista para reenviar"""
+        return [{'tracking_number': number, 'carrier_code': carrier} for number, carrier in self.failed]
+
+    def merge(self, chunk: List[Dict], items: List[Dict]) -> None:
+        """
+        Incorpora la respuesta de un bloque
+
+        Args:
+            chunk: Guías enviadas en el bloque
+            items: `data` de la respuesta de /api/v1/tracking/bulk
+        """
+        answered = set()
+        for item in items:
+            key = tracking_key(item)
+            answered.add(key)
+            if item.get('success'):
+                self.results[key] = item
+                self.failed.pop(key, None)
+            else:
+                self.failed[key] = item
+
+        for item in chunk:
+            key = tracking_key(item)
+            if key not in answered and key not in self.results:
+                self.failed[key] = dict(item, success=False, error='Sin respuesta para esta guía')
+
+    def fail_chunk(self, chunk: List[Dict], error: str) -> None:
+        """Marca como fallidas todas las guías de un bloque cuya petición falló"""
+        for item in chunk:
+            key = tracking_key(item)
+            if key not in self.results:
+                self.failed[key] = dict(item, success=False, error=error)
+
+    def __len__(self) -> int:
+        return len(self.results) + len(self.failed)
+
+
+class TrackingChange:
+    """
+    Cambio de estado o de eventos de una guía vigilada
+
+    Attributes:
+        tracking_number: Número de guía
+        carrier_code: Código de paquetería
+        previous_status: Estado anterior (None en la primera consulta)
+        status: Estado actual (tracking_status)
+        item: Resultado completo de /tracking/bulk para la guía
+        terminal: True si la guía dejó de vigilarse
+    """
+
+    def __init__(
+        self,
+        tracking_number: str,
+        carrier_code: str,
+        previous_status: Optional[str],
+        status: Optional[str],
+        item: Dict,
+        terminal: bool
+    ):
+        self.tracking_number = tracking_number
+        self.carrier_code = carrier_code
+        self.previous_status = previous_status
+        self.status = status
+        self.item = item
+        self.terminal = terminal
+
+    def __repr__(self) -> str:
+        return (
+            f'TrackingChange({self.tracking_number!r}, {self.carrier_code!r}, '
+            f'{self.previous_status!r} -> {self.status!r})'
+        )
+
+
+class _Watched:
+    """Estado interno de una guía vigilada"""
+
+    __slots__ = ('status', 'fingerprint', 'due', 'seq')
+
+    def __init__(self, status: Optional[str], due: float, seq: int):
+        self.status = status
+        self.fingerprint: Optional[str] = None
+        self.due = due
+        self.seq = seq
+
+
+class TrackingWatcher:
+    """
+    Vigila un conjunto de guías y emite solo los cambios reales
+
+    Cada guía tiene su próxima consulta según su tracking_status (las que
+    están en reparto se consultan seguido, las recién creadas rara vez). Las
+    guías vencidas salen de una cola de prioridad y se consultan juntas con
+    client.track_bulk(); las que llegan a un estado terminal dejan de
+    vigilarse. Solo se emite un TrackingChange cuando cambian el estado o la
+    lista de eventos.
+
+    Args:
+        client: SkydropxClient
+        on_change: Función llamada con cada TrackingChange (opcional)
+        intervals: Segundos entre consultas por estado (se combina con POLL_INTERVALS)
+        default_interval: Segundos para estados sin intervalo configurado (default: 3600)
+        error_interval: Segundos antes de reintentar una guía fallida (default: 900)
+        batch_size: Guías por llamada a /tracking/bulk (default: 50)
+        concurrency: Llamadas a /tracking/bulk en paralelo (default: 2)
+    """
+
+    TERMINAL_STATUSES = frozenset({'delivered', 'cancelled', 'returned_to_sender'})
+
+    POLL_INTERVALS = {
+        'created': 6 * 3600,
+        'picked_up': 2 * 3600,
+        'in_transit': 2 * 3600,
+        'available_for_pickup': 3 * 3600,
+        'failed_attempt': 1800,
+        'exception': 1800,
+        'out_for_delivery': 900
+    }
+
+    def __init__(
+        self,
+        client,
+        on_change: Optional[Callable[[TrackingChange], None]] = None,
+        intervals: Optional[Dict[str, float]] = None,
+        default_interval: float = 3600,
+        error_interval: float = 900,
+        batch_size: int = 50,
+        concurrency: int = 2
+    ):
+        self.client = client
+        self.on_change = on_change
+        self.intervals = dict(self.POLL_INTERVALS, **(intervals or {}))
+        self.default_interval = default_interval
+        self.error_interval = error_interval
+        self.batch_size = batch_size
+        self.concurrency = concurrency
+
+        self._watched: Dict[TrackingKey, _Watched] = {}
+        # (due, seq, key); las entradas con seq viejo se descartan al salir
+        self._queue: List[Tuple[float, int, TrackingKey]] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+
+    def _schedule(self, key: TrackingKey, watched: _Watched, due: float) -> None:
+        watched.due = due
+        watched.seq = next(self._seq)
+        heapq.heappush(self._queue, (due, watched.seq, key))
+
+    def interval_for(self, status: Optional[str]) -> float:
+        """Segundos hasta la siguiente consulta de una guía en `status`"""
+        return self.intervals.get(status, self.default_interval)
+
+    def watch(self, tracking_number: str, carrier_code: str, status: Optional[str] = None) -> None:
+        """
+        Agrega una guía (se consulta en la siguiente pasada)
+
+        Args:
+            tracking_number: Número de guía
+            carrier_code: Código de paquetería
+            status: Estado conocido, si ya se tiene (evita emitir un cambio falso)
+        """
+        key = tracking_key({'tracking_number': tracking_number, 'carrier_code': carrier_code})
+        if status in self.TERMINAL_STATUSES:
+            return
+
+        with self._lock:
+            if key in self._watched:
+                return
+            watched = _Watched(status, 0.0, 0)
+            self._watched[key] = watched
+            self._schedule(key, watched, time.monotonic())
+
+    def unwatch(self, tracking_number: str, carrier_code: str) -> None:
+        """Deja de vigilar una guía"""
+        key = tracking_key({'tracking_number': tracking_number, 'carrier_code': carrier_code})
+        with self._lock:
+            self._watched.pop(key, None)
+
+    def next_due_in(self) -> Optional[float]:
+        """Segundos hasta la siguiente guía por consultar (0 si ya hay vencidas, None si no hay guías)"""
+        with self._lock:
+            while self._queue:
+                due, seq, key = self._queue[0]
+                watched = self._watched.get(key)
+                if watched is not None and watched.seq == seq:
+                    return max(0.0, due - time.monotonic())
+                heapq.heappop(self._queue)
+            return None
+
+    def _pop_due(self, now: float) -> List[TrackingKey]:
+        due_keys = []
+        with self._lock:
+            while self._queue and self._queue[0][0] <= now:
+                _, seq, key = heapq.heappop(self._queue)
+                watched = self._watched.get(key)
+                if watched is not None and watched.seq == seq:
+                    due_keys.append(key)
+        return due_keys
+
+    @staticmethod
+    def _fingerprint(item: Dict) -> str:
+        """Huella de estado + eventos, para detectar cambios reales"""
+        return json.dumps(
+            [item.get('tracking_status') or item.get('status'), item.get('events') or item.get('included')],
+            sort_keys=True,
+            default=str
+        )
+
+    def poll(self) -> List[TrackingChange]:
+        """
+        Consulta las guías vencidas y reprograma cada una según su estado
+
+        Returns:
+            Cambios detectados en esta pasada (también se pasan a on_change)
+        """
+        due_keys = self._pop_due(time.monotonic())
+        if not due_keys:
+            return []
+
+        result = self.client.track_bulk(
+            [{'tracking_number': number, 'carrier_code': carrier} for number, carrier in due_keys],
+            chunk_size=self.batch_size,
+            concurrency=self.concurrency,
+            retry_rounds=0
+        )
+
+        changes = []
+        now = time.monotonic()
+
+        with self._lock:
+            for key in due_keys:
+                watched = self._watched.get(key)
+                if watched is None:  # unwatch() durante la consulta
+                    continue
+
+                item = result.results.get(key)
+                if item is None:
+                    self._schedule(key, watched, now + self.error_interval)
+                    continue
+
+                status = item.get('tracking_status') or item.get('status')
+                fingerprint = self._fingerprint(item)
+                terminal = status in self.TERMINAL_STATUSES
+
+                if fingerprint != watched.fingerprint and (watched.fingerprint is not None or status != watched.status or terminal):
+                    changes.append(TrackingChange(key[0], key[1], watched.status, status, item, terminal))
+
+                watched.status = status
+                watched.fingerprint = fingerprint
+
+                if terminal:
+                    del self._watched[key]
+                else:
+                    self._schedule(key, watched, now + self.interval_for(status))
+
+        for change in changes:
+            if self.on_change is not None:
+                try:
+                    self.on_change(change)
+                except Exception:
+                    logger.exception("Error en on_change para %s", change.tracking_number)
+
+        return changes
+
+    def run(self, max_sleep: float = 60.0) -> None:
+        """
+        Consulta en bucle hasta stop(), durmiendo hasta la siguiente guía vencida
+
+        Args:
+            max_sleep: Espera máxima entre revisiones, para notar guías nuevas (default: 60)
+        """
+        self._stop.clear()
+        while not self._stop.is_set():
+            try:
+                self.poll()
+            except Exception:
+                logger.exception("Error consultando guías vigiladas")
+
+            wait = self.next_due_in()
+            self._stop.wait(max_sleep if wait is None else min(max(wait, 0.05), max_sleep))
+
+    def stop(self) -> None:
+        """Detiene run()"""
+        self._stop.set()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._watched)
+
+    def __contains__(self, key: TrackingKey) -> bool:
+        with self._lock:
+            return tuple(key) in self._watched
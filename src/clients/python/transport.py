@@ -0,0 +1,340 @@
+"""
+Capa de transporte HTTP del cliente de Skydropx
+
+`SkydropxClient._request` no llama a `requests` directamente sino a un
+Transport, que recibe método, URL, parámetros, body JSON, headers y
+timeout, y devuelve un TransportResponse (status, headers y bytes). Así se
+puede cambiar la pila HTTP o probar el cliente sin red.
+
+- RequestsTransport: el default, sobre una requests.Session.
+- Urllib3Transport: directo sobre urllib3.PoolManager, con menos capas por petición.
+- MockTransport: respuestas predefinidas en memoria, para pruebas y benchmarks.
+
+Uso:
+    from transport import MockTransport
+
+    mock = MockTransport()
+    mock.add('GET', '/api/v1/tracking', json={'data': {...}})
+
+    client = SkydropxClient('id', 'secret', transport=mock, rate_limit=None)
+    client.track_shipment('794874381730', 'fedex')
+    print(mock.calls[-1].params)
+"""
+
+import json
+from abc import ABC, abstractmethod
+from typing import Callable, Dict, List, Mapping, Optional, Tuple, Union
+from urllib.parse import urlencode, urlsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+try:
+    import urllib3
+except ImportError:  # urllib3 es dependencia de requests, pero por si acaso
+    urllib3 = None
+
+
+Timeout = Union[float, Tuple[float, float]]
+
+DEFAULT_HEADERS = {
+    'Content-Type': 'application/json',
+    'User-Agent': 'Skydropx-Python-SDK/1.0.0'
+}
+
+
+class TransportError(Exception):
+    """Error de red al enviar una petición"""
+
+
+class TransportTimeout(TransportError):
+    """La conexión o la lectura excedieron el timeout"""
+
+
+class TransportConnectionError(TransportError):
+    """No se pudo conectar (DNS, conexión rechazada, TLS, conexión cortada)"""
+
+
+class TransportResponse:
+    """
+    Respuesta HTTP mínima que el cliente necesita
+
+    Args:
+        status_code: Código HTTP
+        headers: Headers (se accede sin distinguir mayúsculas)
+        content: Body en bytes
+    """
+
+    __slots__ = ('status_code', 'headers', 'content')
+
+    def __init__(self, status_code: int, headers: Mapping[str, str], content: bytes):
+        self.status_code = status_code
+        self.headers = headers
+        self.content = content
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code < 400
+
+    @property
+    def text(self) -> str:
+        return self.content.decode('utf-8', errors='replace')
+
+    def json(self):
+        return json.loads(self.content)
+
+
+class Transport(ABC):
+    """Interfaz de transporte: una petición HTTP, sin reintentos ni rate limiting"""
+
+    @abstractmethod
+    def request(
+        self,
+        method: str,
+        url: str,
+        params: Optional[Dict] = None,
+        json_body: Optional[Dict] = None,
+        headers: Optional[Dict[str, str]] = None,
+        timeout: Timeout = 30.0
+    ) -> TransportResponse:
+        """
+        Envía una petición
+
+        Args:
+            method: Método HTTP en mayúsculas
+            url: URL completa, sin query string
+            params: Parámetros de query (los valores None se omiten)
+            json_body: Body a enviar como JSON
+            headers: Headers adicionales
+            timeout: Segundos, o (connect, read)
+
+        Returns:
+            TransportResponse
+
+        Raises:
+            TransportTimeout: Si se excede el timeout
+            TransportConnectionError: Si falla la conexión
+        """
+
+    def close(self) -> None:
+        """Libera las conexiones del transporte"""
+
+
+class RequestsTransport(Transport):
+    """
+    Transporte sobre requests (default)
+
+    Args:
+        session: Sesión a usar; su pool y headers aplican a cada petición (default: una nueva)
+    """
+
+    def __init__(self, session: Optional[requests.Session] = None):
+        if session is None:
+            session = requests.Session()
+            session.headers.update(DEFAULT_HEADERS)
+        self.session = session
+
+    def request(self, method, url, params=None, json_body=None, headers=None, timeout=30.0):
+        try:
+            response = self.session.request(
+                method=method,
+                url=url,
+                json=json_body,
+                params=params,
+                headers=headers,
+                timeout=timeout
+            )
+        except requests.exceptions.Timeout as e:
+            raise TransportTimeout(str(e)) from e
+        except requests.exceptions.ConnectionError as e:
+            raise TransportConnectionError(str(e)) from e
+
+        return TransportResponse(response.status_code, response.headers, response.content)
+
+    def close(self) -> None:
+        self.session.close()
+
+
+class Urllib3Transport(Transport):
+    """
+    Transporte directo sobre urllib3.PoolManager
+
+    Evita la preparación de requests (hooks, cookies, merge de settings) en
+    cada petición. No sigue redirecciones ni reintenta: eso lo decide el
+    cliente.
+
+    Args:
+        num_pools: Hosts distintos con pool propio (default: 10)
+        maxsize: Conexiones guardadas por host (default: 10)
+        block: Esperar una conexión libre en lugar de abrir una extra (default: False)
+        headers: Headers enviados en cada petición (default: Content-Type y User-Agent del SDK)
+        **pool_kwargs: Argumentos adicionales para PoolManager (ej. ca_certs)
+    """
+
+    def __init__(
+        self,
+        num_pools: int = 10,
+        maxsize: int = 10,
+        block: bool = False,
+        headers: Optional[Dict[str, str]] = None,
+        **pool_kwargs
+    ):
+        if urllib3 is None:
+            raise ImportError('Urllib3Transport requiere urllib3: pip install urllib3')
+
+        self.headers = dict(DEFAULT_HEADERS if headers is None else headers)
+        self.pool = urllib3.PoolManager(
+            num_pools=num_pools,
+            maxsize=maxsize,
+            block=block,
+            retries=False,
+            **pool_kwargs
+        )
+
+    def request(self, method, url, params=None, json_body=None, headers=None, timeout=30.0):
+        if params:
+            query = urlencode([(k, v) for k, v in params.items() if v is not None], doseq=True)
+            if query:
+                url = f'{url}?{query}'
+
+        request_headers = dict(self.headers, **headers) if headers else self.headers
+        body = json.dumps(json_body).encode('utf-8') if json_body is not None else None
+
+        if isinstance(timeout, tuple):
+            connect_timeout, read_timeout = timeout
+        else:
+            connect_timeout = read_timeout = timeout
+
+        try:
+            response = self.pool.request(
+                method,
+                url,
+                body=body,
+                headers=request_headers,
+                timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+                redirect=False
+            )
+        except urllib3.exceptions.NewConnectionError as e:
+            raise TransportConnectionError(str(e)) from e
+        except urllib3.exceptions.TimeoutError as e:
+            raise TransportTimeout(str(e)) from e
+        except urllib3.exceptions.HTTPError as e:
+            raise TransportConnectionError(str(e)) from e
+
+        return TransportResponse(response.status, response.headers, response.data)
+
+    def close(self) -> None:
+        self.pool.clear()
+
+
+class MockRequest:
+    """Petición recibida por MockTransport"""
+
+    __slots__ = ('method', 'url', 'path', 'params', 'json', 'headers')
+
+    def __init__(self, method: str, url: str, params: Optional[Dict], json_body: Optional[Dict], headers: Optional[Dict]):
+        self.method = method
+        self.url = url
+        self.path = urlsplit(url).path
+        self.params = params or {}
+        self.json = json_body
+        self.headers = headers or {}
+
+    def __repr__(self) -> str:
+        return f'MockRequest({self.method} {self.path})'
+
+
+MockHandler = Callable[[MockRequest], TransportResponse]
+
+
+class MockTransport(Transport):
+    """
+    Transporte en memoria con respuestas predefinidas
+
+    Las rutas se buscan por método y path exacto, y si no hay, por el
+    prefijo registrado más largo. Los bodies JSON se serializan una sola vez
+    al registrarlos, así el costo por petición es solo el del cliente.
+    POST /api/v1/oauth/token responde un token de prueba si no se registra
+    otra cosa.
+
+    Args:
+        record: Guardar cada petición en `calls` (default: True)
+        default_status: Código para rutas no registradas (default: 404)
+    """
+
+    def __init__(self, record: bool = True, default_status: int = 404):
+        self.record = record
+        self.calls: List[MockRequest] = []
+        self._exact: Dict[Tuple[str, str], MockHandler] = {}
+        self._prefixes: List[Tuple[str, str, MockHandler]] = []
+        self._default = self.response(default_status, {'error': 'Ruta no registrada en MockTransport'})
+
+        self.add('POST', '/api/v1/oauth/token', json={
+            'access_token': 'mock-token',
+            'token_type': 'Bearer',
+            'expires_in': 7200
+        })
+
+    @staticmethod
+    def response(
+        status: int = 200,
+        json_body=None,
+        headers: Optional[Dict[str, str]] = None,
+        content: Optional[bytes] = None
+    ) -> TransportResponse:
+        """Construye un TransportResponse (útil dentro de handlers)"""
+        if content is None:
+            content = json.dumps(json_body).encode('utf-8') if json_body is not None else b''
+        return TransportResponse(status, CaseInsensitiveDict(headers or {}), content)
+
+    def add(
+        self,
+        method: str,
+        path: str,
+        json=None,
+        status: int = 200,
+        headers: Optional[Dict[str, str]] = None,
+        content: Optional[bytes] = None,
+        handler: Optional[MockHandler] = None,
+        prefix: bool = False
+    ) -> None:
+        """
+        Registra una respuesta
+
+        Args:
+            method: Método HTTP
+            path: Path de la URL (ej. '/api/v1/tracking')
+            json: Body JSON de la respuesta
+            status: Código HTTP (default: 200)
+            headers: Headers de la respuesta
+            content: Body en bytes (en lugar de json)
+            handler: Función MockRequest -> TransportResponse, para respuestas dinámicas
+            prefix: Aplicar a todo path que empiece con `path` (ej. '/api/v1/shipments/')
+        """
+        if handler is None:
+            canned = self.response(status, json, headers, content)
+            handler = lambda request: canned
+
+        method = method.upper()
+        if prefix:
+            self._prefixes = [p for p in self._prefixes if (p[0], p[1]) != (method, path)]
+            self._prefixes.append((method, path, handler))
+            self._prefixes.sort(key=lambda p: len(p[1]), reverse=True)
+        else:
+            self._exact[(method, path)] = handler
+
+    def request(self, method, url, params=None, json_body=None, headers=None, timeout=30.0):
+        request = MockRequest(method, url, params, json_body, headers)
+        if self.record:
+            self.calls.append(request)
+
+        handler = self._exact.get((method, request.path))
+        if handler is None:
+            for route_method, route_path, route_handler in self._prefixes:
+                if route_method == method and request.path.startswith(route_path):
+                    handler = route_handler
+                    break
+            else:
+                return self._default
+
+        return handler(request)
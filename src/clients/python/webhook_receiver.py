@@ -0,0 +1,512 @@
+"""
+Receptor de webhooks de alto rendimiento (asyncio, sin dependencias)
+
+Skydropx reintenta una entrega si no recibe 200 a tiempo, así que el
+receptor solo verifica la firma, encola el evento y responde; un pool
+acotado de workers procesa la cola después. Un handler lento ya no retrasa
+el ack ni provoca reintentos.
+
+- POST <path>: verifica, encola y responde 200 {"received": true}. Con la
+  cola llena responde 503 para que Skydropx reintente más tarde.
+- GET /health: estado, profundidad de la cola y throughput.
+
+Con `dedup`, las entregas repetidas de un evento ya aceptado (mismo `id`)
+se confirman sin volver a encolarse. Con `spool`, cada evento verificado
+se escribe en disco (con fsync agrupado) antes del 200, así un handler que
+falla o un proceso que se cae no pierden eventos. El receptor lleva
+`committed_offset`: todo registro anterior ya se procesó con éxito. Lo
+guarda como checkpoint del spool y al arrancar vuelve a encolar lo que quedó
+después de él; `spool.replay()` y `spool.prune()` parten de ahí.
+
+Uso:
+    from webhooks import WebhookVerifier
+    from webhook_receiver import WebhookReceiver
+
+    def handle(event):
+        print(event['event'], event['data']['id'])
+
+    receiver = WebhookReceiver(handle, verifier=WebhookVerifier(secret), workers=8)
+    receiver.run(port=3000)
+"""
+
+import asyncio
+import heapq
+import json
+import logging
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+
+try:
+    from .webhooks import WebhookVerifier, WebhookVerificationError, EventDedupStore
+except ImportError:  # Importado como módulo suelto (ver examples/)
+    from webhooks import WebhookVerifier, WebhookVerificationError, EventDedupStore
+
+try:
+    from .webhook_spool import WebhookSpool
+except ImportError:  # Importado como módulo suelto (ver examples/)
+    from webhook_spool import WebhookSpool
+
+
+logger = logging.getLogger(__name__)
+
+REASONS = {
+    200: 'OK',
+    400: 'Bad Request',
+    401: 'Unauthorized',
+    404: 'Not Found',
+    405: 'Method Not Allowed',
+    408: 'Request Timeout',
+    411: 'Length Required',
+    413: 'Payload Too Large',
+    503: 'Service Unavailable'
+}
+
+
+def _response(status: int, body: Dict, keep_alive: bool = True) -> bytes:
+    """Respuesta HTTP/1.1 completa con body JSON"""
+    payload = json.dumps(body).encode('utf-8')
+    return (
+        f'HTTP/1.1 {status} {REASONS.get(status, "")}\r\n'
+        f'Content-Type: application/json\r\n'
+        f'Content-Length: {len(payload)}\r\n'
+        f'Connection: {"keep-alive" if keep_alive else "close"}\r\n'
+        f'\r\n'
+    ).encode('ascii') + payload
+
+
+# El ack se arma una sola vez
+_ACK = _response(200, {'received': True})
+_ACK_CLOSE = _response(200, {'received': True}, keep_alive=False)
+
+
+class Throughput:
+    """Eventos por segundo en una ventana deslizante de `window` segundos"""
+
+    def __init__(self, window: int = 60):
+        self.window = window
+        self._buckets: Deque[List[int]] = deque()
+
+    def add(self, count: int = 1) -> None:
+        second = int(time.monotonic())
+        if self._buckets and self._buckets[-1][0] == second:
+            self._buckets[-1][1] += count
+        else:
+            self._buckets.append([second, count])
+            self._trim(second)
+
+    def _trim(self, now: int) -> None:
+        while self._buckets and self._buckets[0][0] <= now - self.window:
+            self._buckets.popleft()
+
+    def rate(self, elapsed: Optional[float] = None) -> float:
+        """Eventos por segundo; `elapsed` acorta la ventana si el servidor lleva menos tiempo arriba"""
+        now = int(time.monotonic())
+        self._trim(now)
+        span = self.window if elapsed is None else max(1.0, min(self.window, elapsed))
+        return sum(count for _, count in self._buckets) / span
+
+
+class WebhookReceiver:
+    """
+    Servidor HTTP asyncio que confirma rápido y procesa en segundo plano
+
+    Args:
+        handler: Función (sync o async) que recibe cada evento verificado
+        verifier: WebhookVerifier; None acepta entregas sin firma (solo desarrollo)
+        path: Ruta donde se reciben los webhooks (default: '/webhooks/skydropx')
+        workers: Eventos procesándose a la vez (default: 8). Los handlers
+            síncronos corren en un pool de hilos de ese tamaño.
+        queue_size: Eventos en espera antes de responder 503 (default: 10000)
+        max_body: Tamaño máximo del body en bytes (default: 1 MB)
+        dedup: Almacén de IDs ya recibidos; los duplicados se confirman sin procesarse (opcional).
+            Si el handler falla, el ID se libera para que una nueva entrega vuelva a correr.
+        spool: WebhookSpool donde se guarda cada evento antes de responder 200 (opcional).
+            Si no se puede escribir, se responde 503 y Skydropx reintenta.
+        checkpoint_interval: Segundos mínimos entre escrituras del checkpoint del spool (default: 1)
+        header_timeout: Segundos para recibir los headers de la primera petición (default: 10)
+        body_timeout: Segundos para recibir el body completo (default: 30)
+        idle_timeout: Segundos que una conexión keep-alive espera la siguiente petición (default: 60)
+    """
+
+    def __init__(
+        self,
+        handler: Callable[[Dict], Any],
+        verifier: Optional[WebhookVerifier] = None,
+        path: str = '/webhooks/skydropx',
+        workers: int = 8,
+        queue_size: int = 10000,
+        max_body: int = 1024 * 1024,
+        dedup: Optional[EventDedupStore] = None,
+        spool: Optional[WebhookSpool] = None,
+        checkpoint_interval: float = 1.0,
+        header_timeout: float = 10.0,
+        body_timeout: float = 30.0,
+        idle_timeout: float = 60.0
+    ):
+        self.handler = handler
+        self.verifier = verifier
+        self.path = path
+        self.workers = workers
+        self.queue_size = queue_size
+        self.max_body = max_body
+        self.dedup = dedup
+        self.spool = spool
+        self.checkpoint_interval = checkpoint_interval
+        self.header_timeout = header_timeout
+        self.body_timeout = body_timeout
+        self.idle_timeout = idle_timeout
+
+        self._is_async = asyncio.iscoroutinefunction(handler)
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._worker_tasks: List[asyncio.Task] = []
+        self._connections: Set[asyncio.StreamWriter] = set()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._started_at: Optional[float] = None
+
+        # Offsets del spool aceptados y aún sin procesar con éxito (heap), y los ya
+        # procesados que esperan a que terminen los anteriores
+        self._open_offsets: List[int] = []
+        self._finished_offsets: Set[int] = set()
+        self._spooled_end: Optional[int] = None
+        self._checkpointed_at = 0.0
+        self._recovery_task: Optional[asyncio.Task] = None
+
+        self.counters = {
+            'received': 0, 'processed': 0, 'failed': 0, 'rejected': 0, 'overflow': 0, 'duplicates': 0,
+            'dedup_errors': 0, 'spool_errors': 0
+        }
+        self.received_rate = Throughput()
+        self.processed_rate = Throughput()
+
+    # ============= SERVIDOR =============
+
+    async def start(self, host: str = '0.0.0.0', port: int = 3000) -> None:
+        """Empieza a aceptar conexiones y arranca los workers"""
+        self._queue = asyncio.Queue(maxsize=self.queue_size)
+        if not self._is_async:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='skydropx-webhook')
+        self._worker_tasks = [asyncio.ensure_future(self._worker()) for _ in range(self.workers)]
+        if self.spool is not None:
+            self._recover()
+        self._server = await asyncio.start_server(self._handle_connection, host, port)
+        self._started_at = time.monotonic()
+        logger.info("Receptor de webhooks escuchando en %s:%s%s", host, port, self.path)
+
+    @property
+    def port(self) -> Optional[int]:
+        """Puerto real (útil con port=0)"""
+        if self._server is None or not self._server.sockets:
+            return None
+        return self._server.sockets[0].getsockname()[1]
+
+    async def stop(self, drain: bool = True, timeout: float = 30.0) -> None:
+        """
+        Deja de aceptar entregas y detiene los workers
+
+        Args:
+            drain: Procesar los eventos ya encolados antes de salir (default: True)
+            timeout: Segundos máximos esperando el drenado (default: 30)
+        """
+        if self._server is not None:
+            self._server.close()
+            # Las conexiones keep-alive abiertas impedirían que wait_closed() termine
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+            self._server = None
+
+        if drain and self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout)
+            except asyncio.TimeoutError:
+                logger.warning("Se detuvo con %d eventos sin procesar", self._queue.qsize())
+
+        if self._recovery_task is not None:
+            self._recovery_task.cancel()
+            await asyncio.gather(self._recovery_task, return_exceptions=True)
+            self._recovery_task = None
+
+        for task in self._worker_tasks:
+            task.cancel()
+        await asyncio.gather(*self._worker_tasks, return_exceptions=True)
+        self._worker_tasks = []
+
+        if self.spool is not None:
+            self._checkpoint()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+    async def serve_forever(self, host: str = '0.0.0.0', port: int = 3000) -> None:
+        """Inicia el receptor y atiende hasta que se cancele la tarea"""
+        await self.start(host, port)
+        try:
+            await asyncio.Event().wait()
+        finally:
+            await self.stop()
+
+    def run(self, host: str = '0.0.0.0', port: int = 3000) -> None:
+        """Inicia el receptor bloqueando el hilo actual (Ctrl+C para salir)"""
+        try:
+            asyncio.run(self.serve_forever(host, port))
+        except KeyboardInterrupt:
+            pass
+
+    # ============= HTTP =============
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        """Atiende peticiones HTTP/1.1 (con keep-alive) sobre una conexión"""
+        self._connections.add(writer)
+        # La primera petición tiene header_timeout; después, la espera ociosa entre peticiones
+        head_timeout = self.header_timeout
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b'\r\n\r\n'), head_timeout)
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, asyncio.TimeoutError, ConnectionError):
+                    return
+                head_timeout = self.idle_timeout
+
+                method, target, version, headers = self._parse_head(head)
+                keep_alive = version == 'HTTP/1.1' and headers.get('connection', '').lower() != 'close'
+
+                length = headers.get('content-length')
+                if length is None and 'chunked' in headers.get('transfer-encoding', '').lower():
+                    writer.write(_response(411, {'error': 'Content-Length requerido'}, keep_alive=False))
+                    await writer.drain()
+                    return
+
+                try:
+                    length = int(length or 0)
+                except ValueError:
+                    length = -1
+                if length < 0 or length > self.max_body:
+                    status = 413 if length > self.max_body else 400
+                    writer.write(_response(status, {'error': 'Body inválido'}, keep_alive=False))
+                    await writer.drain()
+                    return
+
+                try:
+                    body = await asyncio.wait_for(reader.readexactly(length), self.body_timeout) if length else b''
+                except asyncio.TimeoutError:
+                    writer.write(_response(408, {'error': 'Body incompleto'}, keep_alive=False))
+                    await writer.drain()
+                    return
+                writer.write(await self._route(method, target, headers, body, keep_alive))
+                await writer.drain()
+
+                if not keep_alive:
+                    return
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        except Exception:
+            logger.exception("Error atendiendo una conexión de webhooks")
+        finally:
+            self._connections.discard(writer)
+            writer.close()
+
+    @staticmethod
+    def _parse_head(head: bytes) -> Tuple[str, str, str, Dict[str, str]]:
+        lines = head.decode('latin-1').split('\r\n')
+        parts = lines[0].split(' ')
+        method, target, version = (parts + ['', '', ''])[:3]
+
+        headers = {}
+        for line in lines[1:]:
+            name, sep, value = line.partition(':')
+            if sep:
+                headers[name.strip().lower()] = value.strip()
+
+        return method, target.split('?', 1)[0], version, headers
+
+    async def _route(self, method: str, path: str, headers: Dict[str, str], body: bytes, keep_alive: bool) -> bytes:
+        if path == self.path:
+            if method != 'POST':
+                return _response(405, {'error': 'Usa POST'}, keep_alive)
+            return await self._accept(headers, body, keep_alive)
+
+        if path == '/health':
+            return _response(200, self.health(), keep_alive)
+
+        return _response(404, {'error': 'Ruta no encontrada'}, keep_alive)
+
+    async def _accept(self, headers: Dict[str, str], body: bytes, keep_alive: bool) -> bytes:
+        """Verifica, guarda en el spool, encola y confirma una entrega (sin esperar al handler)"""
+        try:
+            if self.verifier is not None:
+                event = self.verifier.verify_event(
+                    headers.get('x-skydropx-signature'),
+                    headers.get('x-skydropx-timestamp'),
+                    body
+                )
+            else:
+                event = json.loads(body)
+        except WebhookVerificationError as e:
+            self.counters['rejected'] += 1
+            status = 400 if e.reason == 'invalid_json' else 401
+            return _response(status, {'error': str(e)}, keep_alive)
+        except ValueError:
+            self.counters['rejected'] += 1
+            return _response(400, {'error': 'El body no es JSON válido'}, keep_alive)
+
+        event_id = event.get('id') if isinstance(event, dict) else None
+        if self.dedup is not None and event_id:
+            try:
+                is_new = await self.dedup.claim_async(event_id)
+            except Exception:
+                # Sin saber si es duplicado no hay ack: Skydropx reintenta
+                logger.exception("No se pudo registrar el ID del webhook %s", event_id)
+                self.counters['dedup_errors'] += 1
+                return _response(503, {'error': 'Deduplicación no disponible'}, keep_alive)
+            if not is_new:
+                # Ya se aceptó antes: 200 para que Skydropx deje de reintentar
+                self.counters['duplicates'] += 1
+                return _ACK if keep_alive else _ACK_CLOSE
+
+        offset = None
+        if self.spool is not None:
+            try:
+                offset = self.spool.append(body, wait=False)
+                # Se registra antes de esperar el fsync para que el checkpoint no lo salte
+                heapq.heappush(self._open_offsets, offset)
+                self._spooled_end = offset + self.spool.record_size(body)
+                await self.spool.wait_durable_async(offset)
+            except (OSError, ValueError):
+                # Sin registro en disco no hay ack: Skydropx reintenta
+                logger.exception("No se pudo guardar el webhook en el spool")
+                self._finish_offset(offset)
+                await self._release(event_id)
+                self.counters['spool_errors'] += 1
+                return _response(503, {'error': 'Spool no disponible'}, keep_alive)
+
+        try:
+            self._queue.put_nowait((offset, event))
+        except asyncio.QueueFull:
+            # Sin 200, Skydropx reintenta la entrega más tarde (y se vuelve a guardar)
+            self._finish_offset(offset)
+            await self._release(event_id)
+            self.counters['overflow'] += 1
+            return _response(503, {'error': 'Cola llena'}, keep_alive)
+
+        self.counters['received'] += 1
+        self.received_rate.add()
+        return _ACK if keep_alive else _ACK_CLOSE
+
+    async def _release(self, event_id: Optional[str]) -> None:
+        """Libera el ID en el almacén de dedup para que una reentrega vuelva a procesarse"""
+        if self.dedup is None or not event_id:
+            return
+        try:
+            await self.dedup.release_async(event_id)
+        except Exception:
+            logger.exception("No se pudo liberar el ID del webhook %s", event_id)
+
+    # ============= CHECKPOINT DEL SPOOL =============
+
+    @property
+    def committed_offset(self) -> Optional[int]:
+        """Todo registro del spool con offset menor ya se procesó con éxito (None sin spool)"""
+        if self.spool is None:
+            return None
+        if self._open_offsets:
+            return self._open_offsets[0]
+        return self._spooled_end if self._spooled_end is not None else self.spool.committed_offset
+
+    def _finish_offset(self, offset: Optional[int]) -> None:
+        """Marca el registro como terminado y avanza la marca contigua"""
+        if offset is None:
+            return
+        self._finished_offsets.add(offset)
+        while self._open_offsets and self._open_offsets[0] in self._finished_offsets:
+            self._finished_offsets.discard(heapq.heappop(self._open_offsets))
+
+        if time.monotonic() - self._checkpointed_at >= self.checkpoint_interval:
+            self._checkpoint()
+
+    def _checkpoint(self) -> None:
+        self._checkpointed_at = time.monotonic()
+        try:
+            self.spool.commit(self.committed_offset)
+        except OSError:
+            logger.exception("No se pudo guardar el checkpoint del spool")
+
+    def _recover(self) -> None:
+        """Vuelve a encolar los registros del spool posteriores al checkpoint"""
+        records = list(self.spool.read(self.spool.committed_offset))
+        if not records:
+            return
+
+        logger.warning(
+            "Reprocesando %d eventos del spool desde el offset %s",
+            len(records), records[0].offset
+        )
+        # Todos cuentan como pendientes desde ya: las entregas nuevas no deben saltarlos
+        for record in records:
+            heapq.heappush(self._open_offsets, record.offset)
+        self._spooled_end = records[-1].next_offset
+        self._recovery_task = asyncio.ensure_future(self._feed(records))
+
+    async def _feed(self, records: List) -> None:
+        for record in records:
+            try:
+                event = record.event
+            except ValueError:
+                logger.error("Registro del spool sin JSON válido en el offset %s; se omite", record.offset)
+                self._finish_offset(record.offset)
+                continue
+
+            # Sin consultar dedup: el ID se registró al aceptar, no al procesar,
+            # así que solo el checkpoint dice qué falta
+            await self._queue.put((record.offset, event))
+
+    # ============= WORKERS =============
+
+    async def _worker(self) -> None:
+        loop = asyncio.get_running_loop()
+
+        while True:
+            offset, event = await self._queue.get()
+            try:
+                if self._is_async:
+                    await self.handler(event)
+                else:
+                    await loop.run_in_executor(self._executor, self.handler, event)
+                self.counters['processed'] += 1
+                self.processed_rate.add()
+                self._finish_offset(offset)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # El offset queda pendiente: el checkpoint no lo pasa y se reprocesa al reiniciar
+                self.counters['failed'] += 1
+                event_id = event.get('id') if isinstance(event, dict) else None
+                await self._release(event_id)
+                logger.exception("Error procesando webhook %s (offset %s en el spool)", event_id, offset)
+            finally:
+                self._queue.task_done()
+
+    def health(self) -> Dict:
+        """
+        Estado del receptor
+
+        Returns:
+            Dict con status, queue_depth, queue_capacity, workers, contadores
+            y throughput (eventos/s en el último minuto)
+        """
+        depth = self._queue.qsize() if self._queue is not None else 0
+        uptime = time.monotonic() - self._started_at if self._started_at else 0.0
+        return {
+            'status': 'ok' if depth < self.queue_size else 'saturated',
+            'queue_depth': depth,
+            'queue_capacity': self.queue_size,
+            'workers': self.workers,
+            'uptime': round(uptime, 3),
+            'received_per_second': round(self.received_rate.rate(uptime), 3),
+            'processed_per_second': round(self.processed_rate.rate(uptime), 3),
+            **self.counters,
+            **({'committed_offset': self.committed_offset, 'spool': self.spool.stats()} if self.spool is not None else {})
+        }
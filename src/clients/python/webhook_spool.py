@@ -0,0 +1,558 @@
+"""
+Spool durable de webhooks recibidos
+
+Responder 200 le dice a Skydropx que no vuelva a enviar el evento; si el
+handler falla o el proceso muere después, el evento se pierde. WebhookSpool
+guarda cada evento verificado en un log de solo-anexar en disco antes del
+ack, y permite volver a procesarlo después desde un offset o un rango de
+tiempo.
+
+Group commit: append() escribe el registro de inmediato, pero el fsync lo
+hace un hilo aparte que confirma de una vez todo lo escrito mientras corría
+el fsync anterior. Con muchas entregas simultáneas, un solo fsync cubre
+decenas de eventos.
+
+Formato: segmentos `<offset inicial>.log` con registros
+[largo u32][crc32 u32][recibido_en f64][body]. El offset de un registro es
+su posición global en bytes; es estable y sirve como punto de reanudación.
+El archivo `checkpoint` guarda `committed_offset`: todo registro anterior ya
+se procesó. WebhookReceiver lo avanza al terminar cada evento, y replay()
+y prune() parten de él por default.
+
+Uso:
+    spool = WebhookSpool('/var/lib/app/skydropx-spool')
+
+    offset = spool.append(body)               # regresa cuando ya está en disco
+    offset = await spool.append_async(body)   # dentro de asyncio
+
+    # Reprocesar lo que falta desde el último checkpoint
+    spool.replay(dispatcher.dispatch)
+
+    # Reprocesar lo recibido en la última hora
+    spool.replay(dispatcher.dispatch, since=time.time() - 3600)
+"""
+
+import asyncio
+import collections
+import json
+import logging
+import os
+import struct
+import tempfile
+import threading
+import time
+import zlib
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional, Tuple
+
+
+logger = logging.getLogger(__name__)
+
+
+_HEADER = struct.Struct('>IId')
+_SUFFIX = '.log'
+_CHECKPOINT = 'checkpoint'
+
+
+class SpoolRecord:
+    """
+    Evento guardado en el spool
+
+    Attributes:
+        offset: Posición del registro (para reanudar un replay)
+        next_offset: Posición del registro siguiente
+        received_at: Momento en que se recibió (epoch en segundos)
+        body: Body crudo tal como llegó
+    """
+
+    __slots__ = ('offset', 'next_offset', 'received_at', 'body')
+
+    def __init__(self, offset: int, next_offset: int, received_at: float, body: bytes):
+        self.offset = offset
+        self.next_offset = next_offset
+        self.received_at = received_at
+        self.body = body
+
+    @property
+    def event(self) -> Dict:
+        """Body decodificado como JSON"""
+        return json.loads(self.body)
+
+    def __repr__(self) -> str:
+        return f'SpoolRecord(offset={self.offset}, received_at={self.received_at})'
+
+
+class WebhookSpool:
+    """
+    Log de solo-anexar en disco con fsync agrupado
+
+    Un solo proceso debe escribir en cada directorio. Al abrirse, se descarta
+    un registro incompleto al final del último segmento (escritura cortada
+    por una caída).
+
+    Args:
+        directory: Directorio de los segmentos (se crea si no existe)
+        segment_bytes: Tamaño a partir del cual se abre un segmento nuevo (default: 64 MB)
+        commit_interval: Segundos que el hilo de fsync espera para juntar más
+            escrituras antes de confirmar (default: 0, confirmar en cuanto pueda)
+        fsync: Forzar a disco en cada commit; False solo confía en el page cache (default: True)
+    """
+
+    def __init__(
+        self,
+        directory: str,
+        segment_bytes: int = 64 * 1024 * 1024,
+        commit_interval: float = 0.0,
+        fsync: bool = True
+    ):
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+
+        os.makedirs(directory, exist_ok=True)
+        self._segments: List[int] = sorted(
+            int(name[:-len(_SUFFIX)]) for name in os.listdir(directory)
+            if name.endswith(_SUFFIX) and name[:-len(_SUFFIX)].isdigit()
+        )
+        if not self._segments:
+            self._segments.append(0)
+
+        base = self._segments[-1]
+        # Un segmento recién creado solo sobrevive a una caída si se sincroniza el directorio
+        self._directory_dirty = not os.path.exists(self._segment_path(base))
+        size, self._last_received_at = self._recover(self._segment_path(base))
+        self._fd = os.open(self._segment_path(base), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._end = base + size
+        self._durable = self._end
+        self._committed = min(self._load_checkpoint(), self._end)
+        # Descriptores de segmentos cerrados que aún falta confirmar
+        self._retired: List[int] = []
+        self._waiters: Deque[Tuple[int, Callable[[Optional[BaseException]], None]]] = collections.deque()
+        self._error: Optional[BaseException] = None
+        self._closed = False
+
+        self.commits = 0
+        self.records = 0
+
+        self._cond = threading.Condition()
+        self._flusher = threading.Thread(target=self._flush_loop, name='skydropx-spool-fsync', daemon=True)
+        self._flusher.start()
+
+    # ============= ESCRITURA =============
+
+    def _segment_path(self, base: int) -> str:
+        return os.path.join(self.directory, f'{base:020d}{_SUFFIX}')
+
+    @staticmethod
+    def _recover(path: str) -> Tuple[int, float]:
+        """Recorta un registro incompleto al final del segmento; regresa (tamaño válido, último received_at)"""
+        if not os.path.exists(path):
+            return 0, 0.0
+
+        valid = 0
+        last_received_at = 0.0
+        with open(path, 'r+b') as f:
+            data = f.read()
+            while valid + _HEADER.size <= len(data):
+                length, crc, received_at = _HEADER.unpack_from(data, valid)
+                end = valid + _HEADER.size + length
+                if end > len(data) or zlib.crc32(data[valid + _HEADER.size:end]) != crc:
+                    break
+                valid = end
+                last_received_at = received_at
+
+            if valid < len(data):
+                logger.warning("Spool: se descartan %d bytes incompletos al final de %s", len(data) - valid, path)
+                f.truncate(valid)
+
+        return valid, last_received_at
+
+    @staticmethod
+    def record_size(body: bytes) -> int:
+        """Bytes que ocupa en el spool el registro de `body` (next_offset = offset + record_size)"""
+        return _HEADER.size + len(body)
+
+    def _write(self, body: bytes, received_at: Optional[float]) -> int:
+        """Anexa un registro (sin esperar el fsync) y regresa su offset"""
+        with self._cond:
+            if self._closed:
+                raise ValueError('El spool está cerrado')
+            if self._error is not None:
+                raise self._error
+
+            if self._end - self._segments[-1] >= self.segment_bytes:
+                self._retired.append(self._fd)
+                self._segments.append(self._end)
+                self._fd = os.open(self._segment_path(self._end), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+                self._directory_dirty = True
+
+            # received_at nunca retrocede, así los rangos de tiempo se pueden cortar temprano
+            received_at = max(time.time() if received_at is None else received_at, self._last_received_at)
+            record = _HEADER.pack(len(body), zlib.crc32(body), received_at) + body
+            os.write(self._fd, record)
+
+            offset = self._end
+            self._end += len(record)
+            self._last_received_at = received_at
+            self.records += 1
+            self._cond.notify_all()
+            return offset
+
+    def append(self, body: bytes, received_at: Optional[float] = None, wait: bool = True) -> int:
+        """
+        Guarda un evento
+
+        Args:
+            body: Body crudo del webhook (ya verificado)
+            received_at: Momento de recepción (default: ahora)
+            wait: Esperar a que el registro esté en disco (default: True)
+
+        Returns:
+            Offset del registro
+
+        Raises:
+            OSError: Si falla la escritura o el fsync
+        """
+        offset = self._write(body, received_at)
+        if wait:
+            self.wait_durable(offset)
+        return offset
+
+    async def append_async(self, body: bytes, received_at: Optional[float] = None) -> int:
+        """Como append(), pero espera el fsync sin bloquear el event loop"""
+        offset = self._write(body, received_at)
+        await self.wait_durable_async(offset)
+        return offset
+
+    async def wait_durable_async(self, offset: int) -> None:
+        """Como wait_durable(), sin bloquear el event loop"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def done(error: Optional[BaseException]) -> None:
+            loop.call_soon_threadsafe(_resolve, future, error)
+
+        self._on_durable(offset, done)
+        await future
+
+    def wait_durable(self, offset: int, timeout: Optional[float] = None) -> None:
+        """
+        Bloquea hasta que el registro en `offset` esté en disco
+
+        Raises:
+            OSError: Si falló el fsync
+            TimeoutError: Si se excede `timeout`
+        """
+        with self._cond:
+            if not self._cond.wait_for(lambda: self._durable > offset or self._error is not None, timeout):
+                raise TimeoutError(f'El registro {offset} no se confirmó a tiempo')
+            if self._durable <= offset:
+                raise self._error
+
+    def _on_durable(self, offset: int, callback: Callable[[Optional[BaseException]], None]) -> None:
+        with self._cond:
+            if self._durable <= offset and self._error is None:
+                self._waiters.append((offset, callback))
+                return
+            error = None if self._durable > offset else self._error
+        callback(error)
+
+    def _flush_loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait_for(
+                    lambda: self._end > self._durable or self._retired or self._directory_dirty or self._closed
+                )
+                if self._closed and self._end == self._durable and not self._retired and not self._directory_dirty:
+                    return
+
+            if self.commit_interval:
+                time.sleep(self.commit_interval)
+
+            with self._cond:
+                fd, end = self._fd, self._end
+                retired, self._retired = self._retired, []
+                directory_dirty, self._directory_dirty = self._directory_dirty, False
+
+            error = None
+            try:
+                for old in retired:
+                    if self.fsync:
+                        os.fsync(old)
+                    os.close(old)
+                if self.fsync:
+                    _sync(fd)
+                    # La entrada del segmento nuevo en el directorio, antes de reportar durable
+                    if directory_dirty:
+                        _sync_directory(self.directory)
+            except OSError as e:
+                logger.exception("Spool: falló el fsync")
+                error = e
+
+            with self._cond:
+                if error is None:
+                    self._durable = end
+                    self.commits += 1
+                    ready = []
+                    while self._waiters and self._waiters[0][0] < end:
+                        ready.append(self._waiters.popleft()[1])
+                else:
+                    # Sin garantía de qué llegó a disco: se rechaza toda escritura pendiente o futura
+                    self._error = error
+                    ready = [callback for _, callback in self._waiters]
+                    self._waiters.clear()
+                self._cond.notify_all()
+
+            for callback in ready:
+                callback(error)
+
+            if error is not None:
+                return
+
+    # ============= LECTURA Y REPLAY =============
+
+    def _first_received_at(self, base: int) -> Optional[float]:
+        with open(self._segment_path(base), 'rb') as f:
+            header = f.read(_HEADER.size)
+        return _HEADER.unpack(header)[2] if len(header) == _HEADER.size else None
+
+    def read(
+        self,
+        offset: int = 0,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> Iterator[SpoolRecord]:
+        """
+        Recorre los registros confirmados en orden
+
+        Args:
+            offset: Offset del primer registro (uno devuelto por append() o SpoolRecord.offset)
+            since: Solo registros recibidos en o después de este epoch
+            until: Solo registros recibidos antes de este epoch
+
+        Yields:
+            SpoolRecord
+        """
+        with self._cond:
+            segments = list(self._segments)
+            durable = self._durable
+
+        for i, base in enumerate(segments):
+            limit = min(segments[i + 1] if i + 1 < len(segments) else durable, durable)
+            if limit <= offset:
+                continue
+            # El segmento siguiente empieza antes de `since`: este completo queda fuera
+            if since is not None and i + 1 < len(segments) and segments[i + 1] < durable:
+                first = self._first_received_at(segments[i + 1])
+                if first is not None and first < since:
+                    continue
+
+            position = max(offset, base)
+            with open(self._segment_path(base), 'rb') as f:
+                f.seek(position - base)
+                while position < limit:
+                    header = f.read(_HEADER.size)
+                    if len(header) < _HEADER.size:
+                        break
+                    length, crc, received_at = _HEADER.unpack(header)
+                    body = f.read(length)
+                    if len(body) < length or zlib.crc32(body) != crc:
+                        raise ValueError(f'Registro corrupto en el offset {position}')
+
+                    record = SpoolRecord(position, position + _HEADER.size + length, received_at, body)
+                    position = record.next_offset
+
+                    if until is not None and received_at >= until:
+                        return
+                    if since is None or received_at >= since:
+                        yield record
+
+    def replay(
+        self,
+        handler: Callable[[Dict], Any],
+        offset: Optional[int] = None,
+        since: Optional[float] = None,
+        until: Optional[float] = None
+    ) -> int:
+        """
+        Vuelve a pasar los eventos guardados por `handler`, en orden
+
+        Lo ya procesado se distingue solo por el checkpoint: todo registro a
+        partir de `offset` se entrega, aunque su ID ya esté en un almacén de
+        dedup (el receptor registra el ID al aceptar, antes de procesarlo).
+        Si el handler falla, la excepción se propaga y el offset del evento
+        queda en el log, para reanudar desde ahí. Si el replay parte del
+        checkpoint (o antes) y no filtra por tiempo, el checkpoint avanza
+        hasta donde llegó.
+
+        Args:
+            handler: Función que recibe cada evento (dict)
+            offset: Offset desde donde empezar (default: committed_offset, o el inicio si se filtra por tiempo)
+            since: Solo eventos recibidos en o después de este epoch
+            until: Solo eventos recibidos antes de este epoch
+
+        Returns:
+            Offset siguiente al último evento procesado (para reanudar)
+        """
+        if offset is None:
+            offset = self.committed_offset if since is None and until is None else 0
+
+        # El checkpoint solo avanza si el replay cubre todo lo pendiente sin huecos
+        contiguous = since is None and until is None and offset <= self.committed_offset
+
+        next_offset = offset
+        for record in self.read(offset, since, until):
+            try:
+                handler(record.event)
+            except Exception:
+                logger.error("Replay detenido en el offset %s", record.offset)
+                if contiguous:
+                    self.commit(next_offset)
+                raise
+            next_offset = record.next_offset
+
+        if contiguous:
+            self.commit(next_offset)
+        return next_offset
+
+    # ============= MANTENIMIENTO =============
+
+    def _load_checkpoint(self) -> int:
+        try:
+            with open(os.path.join(self.directory, _CHECKPOINT), 'r', encoding='utf-8') as f:
+                return int(json.load(f)['committed_offset'])
+        except (FileNotFoundError, ValueError, KeyError, TypeError):
+            return 0
+
+    @property
+    def committed_offset(self) -> int:
+        """Todo registro con offset menor ya se procesó (checkpoint persistido)"""
+        with self._cond:
+            return self._committed
+
+    def commit(self, offset: int) -> None:
+        """
+        Avanza el checkpoint: los registros antes de `offset` ya se procesaron
+
+        Solo avanza (un offset menor se ignora) y se escribe de forma atómica.
+        Debe cubrir un rango contiguo: lo que quede antes de `offset` no se
+        vuelve a entregar en replay() ni en la recuperación del receptor.
+        """
+        with self._cond:
+            if offset <= self._committed:
+                return
+            self._committed = min(offset, self._durable)
+            committed = self._committed
+
+            fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.checkpoint-')
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump({'committed_offset': committed, 'committed_at': time.time()}, f)
+                    if self.fsync:
+                        f.flush()
+                        os.fsync(f.fileno())
+                os.replace(tmp_path, os.path.join(self.directory, _CHECKPOINT))
+            except BaseException:
+                os.unlink(tmp_path)
+                raise
+
+            # Sin esto, el rename puede perderse en una caída y el checkpoint retrocede
+            if self.fsync:
+                _sync_directory(self.directory)
+
+    @property
+    def end_offset(self) -> int:
+        """Offset que tendrá el siguiente registro"""
+        with self._cond:
+            return self._end
+
+    @property
+    def durable_offset(self) -> int:
+        """Todo registro con offset menor ya está en disco"""
+        with self._cond:
+            return self._durable
+
+    def prune(self, before: Optional[int] = None) -> int:
+        """
+        Borra los segmentos completos anteriores a `before`
+
+        Args:
+            before: Offset a partir del cual se conservan los eventos (default: committed_offset)
+
+        Returns:
+            Segmentos eliminados
+        """
+        if before is None:
+            before = self.committed_offset
+
+        with self._cond:
+            removable = [
+                base for i, base in enumerate(self._segments[:-1])
+                if self._segments[i + 1] <= min(before, self._durable)
+            ]
+            self._segments = [base for base in self._segments if base not in removable]
+
+        for base in removable:
+            os.remove(self._segment_path(base))
+        return len(removable)
+
+    def stats(self) -> Dict[str, float]:
+        """Registros escritos, commits (fsync) y registros por commit en esta sesión"""
+        with self._cond:
+            return {
+                'records': self.records,
+                'commits': self.commits,
+                'records_per_commit': round(self.records / self.commits, 2) if self.commits else 0.0,
+                'end_offset': self._end,
+                'durable_offset': self._durable,
+                'committed_offset': self._committed,
+                'segments': len(self._segments)
+            }
+
+    def close(self) -> None:
+        """Confirma lo pendiente y cierra el spool"""
+        with self._cond:
+            if self._closed:
+                return
+            self._closed = True
+            self._cond.notify_all()
+        self._flusher.join()
+
+        with self._cond:
+            for fd in self._retired + [self._fd]:
+                os.close(fd)
+            self._retired = []
+
+    def __enter__(self) -> 'WebhookSpool':
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+
+def _sync(fd: int) -> None:
+    # fdatasync evita escribir metadatos que no hacen falta para releer los datos
+    if hasattr(os, 'fdatasync'):
+        os.fdatasync(fd)
+    else:
+        os.fsync(fd)
+
+
+def _sync_directory(path: str) -> None:
+    # Persiste las entradas del directorio (archivos creados o renombrados); Windows no lo permite
+    if not hasattr(os, 'O_DIRECTORY'):
+        return
+    fd = os.open(path, os.O_RDONLY | os.O_DIRECTORY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def _resolve(future: 'asyncio.Future', error: Optional[BaseException]) -> None:
+    if future.done():
+        return
+    if error is None:
+        future.set_result(None)
+    else:
+        future.set_exception(error)
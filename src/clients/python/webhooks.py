@@ -0,0 +1,537 @@
+"""
+Utilidades para recibir webhooks de Skydropx
+
+WebhookVerifier guarda el estado HMAC-SHA512 ya inicializado con el secret
+y verifica cada entrega sobre los bytes crudos del body: el timestamp, el
+punto y el payload se alimentan al HMAC por partes, sin concatenar ni
+decodificar, y el evento se parsea desde el mismo buffer.
+
+WebhookDispatcher enruta cada evento a sus handlers mediante una tabla
+precompilada: el costo de despachar es una búsqueda en un dict, sin
+importar cuántos tipos de evento haya registrados.
+
+EventDedupStore y SQLiteEventDedupStore recuerdan los IDs de evento ya
+recibidos: Skydropx reintenta entregas, y una entrega repetida no debe
+volver a imprimir una guía ni a notificar al cliente.
+
+Uso:
+    from webhooks import WebhookVerifier, WebhookVerificationError
+
+    verifier = WebhookVerifier(os.environ['SKYDROPX_WEBHOOK_SECRET'])
+
+    try:
+        event = verifier.verify_event(
+            request.headers['X-Skydropx-Signature'],
+            request.headers['X-Skydropx-Timestamp'],
+            request.get_data()   # bytes, sin as_text
+        )
+    except WebhookVerificationError as e:
+        return {'error': e.reason}, 401
+
+    dispatcher = WebhookDispatcher()
+
+    @dispatcher.on('shipment.delivered')
+    def on_delivered(event):
+        ...
+
+    @dispatcher.on('package.*')
+    async def on_package(event):
+        ...
+
+    dispatcher.dispatch(event)            # código síncrono
+    await dispatcher.dispatch_async(event)  # dentro de asyncio
+
+    dedup = SQLiteEventDedupStore('/var/lib/app/skydropx-events.db')
+    if dedup.claim(event['id']):
+        dispatcher.dispatch(event)
+"""
+
+import asyncio
+import hashlib
+import hmac
+import itertools
+import json
+import logging
+import sqlite3
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple, Union
+
+try:
+    from .cache import TTLCache
+    from .sqlite_connections import SQLiteConnections
+except ImportError:  # Importado como módulo suelto (ver examples/)
+    from cache import TTLCache
+    from sqlite_connections import SQLiteConnections
+
+
+logger = logging.getLogger(__name__)
+
+
+Buffer = Union[bytes, bytearray, memoryview]
+
+
+class WebhookVerificationError(Exception):
+    """
+    La entrega no pasó la verificación
+
+    Attributes:
+        reason: 'missing_headers', 'invalid_timestamp', 'timestamp_too_old',
+            'invalid_signature' o 'invalid_json'
+    """
+
+    MESSAGES = {
+        'missing_headers': 'Faltan los headers de firma o timestamp',
+        'invalid_timestamp': 'Timestamp inválido',
+        'timestamp_too_old': 'Timestamp fuera de la tolerancia',
+        'invalid_signature': 'Firma inválida',
+        'invalid_json': 'El body no es JSON válido'
+    }
+
+    def __init__(self, reason: str):
+        self.reason = reason
+        super().__init__(self.MESSAGES.get(reason, reason))
+
+
+class WebhookVerifier:
+    """
+    Verificador reutilizable de firmas HMAC-SHA512
+
+    Crea una instancia por secret al arrancar y compártela entre requests e
+    hilos: cada verificación copia el estado ya inicializado con la llave
+    (hmac.copy()) en lugar de volver a procesar el secret.
+
+    Args:
+        secret: Secret del webhook (str o bytes)
+        tolerance: Antigüedad máxima del timestamp en segundos, contra replay
+            attacks (default: 300; None para no validar)
+    """
+
+    SIGNATURE_PREFIX = 'sha512='
+
+    def __init__(self, secret: Union[str, bytes], tolerance: Optional[float] = 300):
+        key = secret.encode('utf-8') if isinstance(secret, str) else bytes(secret)
+        self._keyed = hmac.new(key, digestmod=hashlib.sha512)
+        self.tolerance = tolerance
+
+    def digest(self, timestamp: Union[str, bytes], payload: Union[str, Buffer]) -> bytes:
+        """HMAC-SHA512 crudo de `timestamp.payload`"""
+        mac = self._keyed.copy()
+        mac.update(timestamp.encode('ascii') if isinstance(timestamp, str) else timestamp)
+        mac.update(b'.')
+        mac.update(payload.encode('utf-8') if isinstance(payload, str) else payload)
+        return mac.digest()
+
+    def sign(self, timestamp: Union[str, bytes], payload: Union[str, Buffer]) -> str:
+        """Firma en el formato del header X-Skydropx-Signature (útil para pruebas)"""
+        return self.SIGNATURE_PREFIX + self.digest(timestamp, payload).hex()
+
+    def _check(
+        self,
+        signature: Optional[Union[str, bytes]],
+        timestamp: Optional[Union[str, bytes]],
+        payload: Union[str, Buffer]
+    ) -> None:
+        """Lanza WebhookVerificationError si la entrega no es válida"""
+        if not signature or not timestamp:
+            raise WebhookVerificationError('missing_headers')
+
+        # Solo dígitos ASCII: int() también aceptaría dígitos Unicode (ej. arábigo-índicos)
+        if isinstance(timestamp, str):
+            try:
+                timestamp = timestamp.encode('ascii')
+            except UnicodeEncodeError:
+                raise WebhookVerificationError('invalid_timestamp')
+
+        if self.tolerance is not None:
+            try:
+                sent_at = int(timestamp)
+            except ValueError:
+                raise WebhookVerificationError('invalid_timestamp')
+            if abs(time.time() - sent_at) > self.tolerance:
+                raise WebhookVerificationError('timestamp_too_old')
+
+        if isinstance(signature, bytes):
+            signature = signature.decode('ascii', errors='replace')
+        if signature.startswith(self.SIGNATURE_PREFIX):
+            signature = signature[len(self.SIGNATURE_PREFIX):]
+
+        # Comparar digests crudos evita codificar el calculado a hex
+        try:
+            received = bytes.fromhex(signature)
+        except ValueError:
+            raise WebhookVerificationError('invalid_signature')
+
+        if not hmac.compare_digest(received, self.digest(timestamp, payload)):
+            raise WebhookVerificationError('invalid_signature')
+
+    def verify(
+        self,
+        signature: Optional[Union[str, bytes]],
+        timestamp: Optional[Union[str, bytes]],
+        payload: Union[str, Buffer]
+    ) -> bool:
+        """
+        Verifica firma y timestamp
+
+        Args:
+            signature: Header X-Skydropx-Signature (con o sin 'sha512=')
+            timestamp: Header X-Skydropx-Timestamp
+            payload: Body crudo (bytes, bytearray, memoryview o str)
+
+        Returns:
+            True si la entrega es válida
+        """
+        try:
+            self._check(signature, timestamp, payload)
+        except WebhookVerificationError:
+            return False
+        return True
+
+    def verify_event(
+        self,
+        signature: Optional[Union[str, bytes]],
+        timestamp: Optional[Union[str, bytes]],
+        payload: Union[str, Buffer]
+    ) -> Dict:
+        """
+        Verifica la entrega y devuelve el evento parseado
+
+        Args:
+            signature: Header X-Skydropx-Signature
+            timestamp: Header X-Skydropx-Timestamp
+            payload: Body crudo
+
+        Returns:
+            Evento (dict con id, event, data, ...)
+
+        Raises:
+            WebhookVerificationError: Si la firma, el timestamp o el JSON no son válidos
+        """
+        self._check(signature, timestamp, payload)
+
+        try:
+            # json.loads acepta bytes directamente (detecta UTF-8); memoryview no
+            return json.loads(payload if not isinstance(payload, memoryview) else payload.tobytes())
+        except ValueError:
+            raise WebhookVerificationError('invalid_json')
+
+
+Handler = Callable[[Dict], Any]
+
+
+class WebhookDispatchError(Exception):
+    """
+    Uno o más handlers fallaron al procesar un evento
+
+    Attributes:
+        event: Evento despachado
+        errors: Lista de (handler, excepción)
+    """
+
+    def __init__(self, event: Dict, errors: List[Tuple[Handler, BaseException]]):
+        self.event = event
+        self.errors = errors
+        names = ', '.join(getattr(handler, '__name__', repr(handler)) for handler, _ in errors)
+        super().__init__(f"{len(errors)} handler(s) fallaron para {event.get('event')}: {names}")
+
+
+class WebhookDispatcher:
+    """
+    Registro de handlers por tipo de evento
+
+    Patrones:
+        'shipment.delivered'  nombre exacto
+        'shipment.*'          prefijo (todo lo que empiece con 'shipment.')
+        '*'                   todos los eventos
+
+    Para cada nombre de evento se compila una sola vez la tupla de handlers
+    (exactos, luego prefijos del más específico al más general, luego '*')
+    y se guarda en una tabla; registrar o quitar un handler la invalida.
+    Varios handlers por patrón se ejecutan en orden de registro, y uno que
+    falla no impide que corran los demás.
+
+    Args:
+        max_table_size: Nombres de evento distintos que se guardan compilados (default: 1024)
+    """
+
+    def __init__(self, max_table_size: int = 1024):
+        self.max_table_size = max_table_size
+        self._exact: Dict[str, List[Handler]] = {}
+        self._prefixes: Dict[str, List[Handler]] = {}
+        self._table: Dict[str, Tuple[Handler, ...]] = {}
+        self._lock = threading.Lock()
+
+    def add(self, pattern: str, handler: Handler) -> None:
+        """Registra `handler` (función sync o async) para `pattern`"""
+        with self._lock:
+            if pattern.endswith('*'):
+                self._prefixes.setdefault(pattern[:-1], []).append(handler)
+            else:
+                self._exact.setdefault(pattern, []).append(handler)
+            self._table = {}
+
+    def on(self, pattern: str) -> Callable[[Handler], Handler]:
+        """Decorador equivalente a add(pattern, handler)"""
+        def decorator(handler: Handler) -> Handler:
+            self.add(pattern, handler)
+            return handler
+        return decorator
+
+    def remove(self, pattern: str, handler: Handler) -> None:
+        """Quita un handler registrado para `pattern`"""
+        with self._lock:
+            registry = self._prefixes if pattern.endswith('*') else self._exact
+            key = pattern[:-1] if pattern.endswith('*') else pattern
+            handlers = registry.get(key, [])
+            if handler in handlers:
+                handlers.remove(handler)
+                if not handlers:
+                    del registry[key]
+            self._table = {}
+
+    def handlers_for(self, event_type: str) -> Tuple[Handler, ...]:
+        """Handlers que atienden `event_type`, desde la tabla compilada"""
+        handlers = self._table.get(event_type)
+        if handlers is not None:
+            return handlers
+
+        with self._lock:
+            compiled: List[Handler] = list(self._exact.get(event_type, ()))
+            for prefix in sorted(self._prefixes, key=len, reverse=True):
+                if event_type.startswith(prefix):
+                    compiled.extend(self._prefixes[prefix])
+            handlers = tuple(compiled)
+
+            if len(self._table) >= self.max_table_size:
+                self._table = {}
+            self._table[event_type] = handlers
+
+        return handlers
+
+    def dispatch(self, event: Dict) -> int:
+        """
+        Ejecuta los handlers del evento en el hilo actual
+
+        Los handlers async se ejecutan con asyncio.run(); dentro de un event
+        loop usa dispatch_async().
+
+        Returns:
+            Número de handlers ejecutados (0 si el evento no tiene handlers)
+
+        Raises:
+            WebhookDispatchError: Si algún handler lanzó una excepción
+        """
+        handlers = self.handlers_for(event.get('event', ''))
+        errors = []
+
+        for handler in handlers:
+            try:
+                result = handler(event)
+                if asyncio.iscoroutine(result):
+                    asyncio.run(result)
+            except Exception as e:
+                logger.exception("Error en handler de %s", event.get('event'))
+                errors.append((handler, e))
+
+        if errors:
+            raise WebhookDispatchError(event, errors)
+        return len(handlers)
+
+    async def dispatch_async(self, event: Dict) -> int:
+        """
+        Ejecuta los handlers del evento desde asyncio
+
+        Los handlers async se esperan en el loop actual; los síncronos corren
+        en el executor por defecto para no bloquearlo. Sirve directamente
+        como handler de WebhookReceiver.
+
+        Returns:
+            Número de handlers ejecutados
+
+        Raises:
+            WebhookDispatchError: Si algún handler lanzó una excepción
+        """
+        handlers = self.handlers_for(event.get('event', ''))
+        if not handlers:
+            return 0
+
+        loop = asyncio.get_running_loop()
+        errors = []
+
+        for handler in handlers:
+            try:
+                if asyncio.iscoroutinefunction(handler):
+                    await handler(event)
+                else:
+                    result = await loop.run_in_executor(None, handler, event)
+                    if asyncio.iscoroutine(result):
+                        await result
+            except Exception as e:
+                logger.exception("Error en handler de %s", event.get('event'))
+                errors.append((handler, e))
+
+        if errors:
+            raise WebhookDispatchError(event, errors)
+        return len(handlers)
+
+    __call__ = dispatch
+
+
+class EventDedupStore:
+    """
+    IDs de evento ya recibidos, en memoria (LRU acotada con TTL)
+
+    claim() registra el ID y dice si es la primera vez que se ve, de forma
+    atómica: de dos entregas simultáneas del mismo evento solo una gana.
+
+    Args:
+        ttl: Segundos que se recuerda cada ID (default: 3 días)
+        max_entries: IDs máximos en memoria; se descartan los menos recientes (default: 100000)
+    """
+
+    def __init__(self, ttl: float = 3 * 86400, max_entries: int = 100000):
+        self.ttl = ttl
+        self._memory = TTLCache(ttl, max_entries)
+
+    def claim(self, event_id: str) -> bool:
+        """
+        Registra `event_id`
+
+        Returns:
+            True si es nuevo (hay que procesarlo), False si es un duplicado
+        """
+        return self._memory.add(event_id)
+
+    async def claim_async(self, event_id: str) -> bool:
+        """Como claim(), sin bloquear el event loop"""
+        return self.claim(event_id)
+
+    def release(self, event_id: str) -> None:
+        """Olvida `event_id` (su procesamiento falló y una nueva entrega debe correr)"""
+        self._memory.delete(event_id)
+
+    async def release_async(self, event_id: str) -> None:
+        """Como release(), sin bloquear el event loop"""
+        self.release(event_id)
+
+    def seen(self, event_id: str) -> bool:
+        """True si `event_id` ya se registró y sigue vigente"""
+        return self._memory.get(event_id) is not None
+
+    def stats(self) -> Dict[str, float]:
+        """Estadísticas de la capa en memoria (hits = duplicados)"""
+        return self._memory.stats()
+
+
+class SQLiteEventDedupStore(EventDedupStore):
+    """
+    IDs de evento en SQLite, con la capa en memoria al frente
+
+    Sobrevive reinicios y puede compartirse entre procesos: el upsert sobre
+    la llave primaria decide qué proceso se queda con cada evento. Los
+    duplicados recientes se resuelven en memoria sin tocar el disco, y los
+    IDs vencidos se purgan cada `purge_every` registros. claim_async() y
+    release_async() hacen la parte de SQLite en el executor del loop.
+    Requiere SQLite 3.24+ (ON CONFLICT ... DO UPDATE).
+
+    Args:
+        path: Ruta del archivo SQLite (se crea si no existe)
+        ttl: Segundos que se recuerda cada ID (default: 3 días)
+        max_entries: IDs en la capa de memoria (default: 100000)
+        purge_every: Registros entre purgas de IDs vencidos (default: 1000)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        ttl: float = 3 * 86400,
+        max_entries: int = 100000,
+        purge_every: int = 1000
+    ):
+        super().__init__(ttl=ttl, max_entries=max_entries)
+        self.path = path
+        self.purge_every = purge_every
+        # next() sobre itertools.count es atómico: claim() corre desde varios hilos
+        self._claims = itertools.count(1)
+        self._connections = SQLiteConnections(path)
+
+        conn = self._connections.get()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS webhook_events ('
+            'event_id TEXT PRIMARY KEY, seen_at REAL NOT NULL)'
+        )
+
+    def _claim_disk(self, event_id: str) -> bool:
+        now = time.time()
+        # Una sola transacción; un ID vencido cuenta como nuevo
+        inserted = self._connections.get().execute(
+            'INSERT INTO webhook_events (event_id, seen_at) VALUES (?, ?) '
+            'ON CONFLICT(event_id) DO UPDATE SET seen_at = excluded.seen_at '
+            'WHERE webhook_events.seen_at < ?',
+            (event_id, now, now - self.ttl)
+        ).rowcount == 1
+
+        if next(self._claims) % self.purge_every == 0:
+            try:
+                self.purge()
+            except sqlite3.Error:
+                # El ID ya quedó registrado: una purga fallida no debe invalidar el claim
+                logger.warning("No se pudieron purgar los IDs de webhook vencidos", exc_info=True)
+
+        return inserted
+
+    def claim(self, event_id: str) -> bool:
+        if not self._memory.add(event_id):
+            return False
+
+        try:
+            return self._claim_disk(event_id)
+        except Exception:
+            # Sin registro en disco el ID no cuenta como visto: el reintento debe procesarse
+            self._memory.delete(event_id)
+            raise
+
+    async def claim_async(self, event_id: str) -> bool:
+        if not self._memory.add(event_id):
+            return False
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(None, self._claim_disk, event_id)
+        except Exception:
+            self._memory.delete(event_id)
+            raise
+
+    def _release_disk(self, event_id: str) -> None:
+        self._connections.get().execute('DELETE FROM webhook_events WHERE event_id = ?', (event_id,))
+
+    def release(self, event_id: str) -> None:
+        super().release(event_id)
+        self._release_disk(event_id)
+
+    async def release_async(self, event_id: str) -> None:
+        super().release(event_id)
+        await asyncio.get_running_loop().run_in_executor(None, self._release_disk, event_id)
+
+    def seen(self, event_id: str) -> bool:
+        if super().seen(event_id):
+            return True
+        row = self._connections.get().execute(
+            'SELECT 1 FROM webhook_events WHERE event_id = ? AND seen_at >= ?',
+            (event_id, time.time() - self.ttl)
+        ).fetchone()
+        return row is not None
+
+    def purge(self) -> int:
+        """
+        Elimina los IDs vencidos del archivo
+
+        Returns:
+            Número de IDs eliminados
+        """
+        cursor = self._connections.get().execute(
+            'DELETE FROM webhook_events WHERE seen_at < ?',
+            (time.time() - self.ttl,)
+        )
+        return cursor.rowcount